@@ -1,48 +1,101 @@
 # app.py - Main application entry point
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache, TemplateError
 from config import Config
-from database import init_db
+from database import init_db, close_request_db, report_request_queries
 
+import importlib
 import os
+import threading
+
+# Blueprints to register: (module path, blueprint attribute, url prefix)
+BLUEPRINTS = (
+    ('routes.auth', 'auth_bp', None),
+    ('routes.admins', 'admin_bp', '/admins'),
+    ('routes.students', 'students_bp', '/students'),
+    ('routes.teachers', 'teachers_bp', '/teachers'),
+    ('routes.events', 'events_bp', '/events'),
+    ('routes.donations', 'donations_bp', '/donations'),
+    ('routes.expenses', 'expenses_bp', '/expenses'),
+    ('routes.results', 'results_bp', '/results'),
+    ('routes.logs', 'logs_bp', '/logs'),
+    ('routes.main', 'main_bp', None),
+)
+
+
+def _register_blueprint(app, module_path, attr, url_prefix=None):
+    """Import a route module by path and register its blueprint"""
+    module = importlib.import_module(module_path)
+    app.register_blueprint(getattr(module, attr), url_prefix=url_prefix)
+
+
+def _configure_templates(app):
+    """Cache compiled templates on disk and compile them all before serving"""
+    cache_dir = app.config['TEMPLATE_CACHE_DIR']
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    # Outside debug mode templates never reload, so compile them once at boot
+    # instead of on the first request that renders each one
+    if not app.debug:
+        for name in app.jinja_env.list_templates(extensions=['html']):
+            try:
+                app.jinja_env.get_template(name)
+            except TemplateError as e:
+                app.logger.warning(f"Could not precompile template {name}: {e}")
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    # Flask treats None, not 0, as "no limit"
+    app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH or None
 
-    # Initialize database
-    init_db()
+    # Check the database on the first request in debug mode only, so CLI
+    # commands, tests and production workers skip the diagnostic round-trip;
+    # the connection pool opens connections on demand anyway
+    db_ready = False
+    db_lock = threading.Lock()
+
+    @app.before_request
+    def ensure_db_initialized():
+        nonlocal db_ready
+        if db_ready or not app.debug:
+            return
+        with db_lock:
+            if not db_ready:
+                init_db()
+                db_ready = True
+
+    # Queries in a request share one pooled connection, returned here
+    app.teardown_appcontext(close_request_db)
+
+    # Flag requests that run suspiciously many queries (N+1 loops)
+    if app.config['DB_QUERY_WARN_THRESHOLD']:
+        app.teardown_request(report_request_queries)
 
     # Register blueprints
-    from routes.auth import auth_bp
-    from routes.admins import admin_bp
-    from routes.students import students_bp
-    from routes.teachers import teachers_bp
-    from routes.events import events_bp
-    from routes.donations import donations_bp
-    from routes.expenses import expenses_bp
-    from routes.results import results_bp
-    from routes.main import main_bp
-    from routes.logs import logs_bp
-
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(admin_bp, url_prefix='/admins')
-    app.register_blueprint(students_bp, url_prefix='/students')
-    app.register_blueprint(teachers_bp, url_prefix='/teachers')
-    app.register_blueprint(events_bp, url_prefix='/events')
-    app.register_blueprint(donations_bp, url_prefix='/donations')
-    app.register_blueprint(expenses_bp, url_prefix='/expenses')
-    app.register_blueprint(results_bp, url_prefix='/results')
-    app.register_blueprint(logs_bp, url_prefix='/logs')
-    app.register_blueprint(main_bp)
+    for module_path, attr, url_prefix in BLUEPRINTS:
+        _register_blueprint(app, module_path, attr, url_prefix)
 
     # Register error handlers
     from utils.error_handlers import register_error_handlers
     register_error_handlers(app)
 
+    # Use orjson for jsonify() when it is installed
+    from utils.serialization import register_json_provider
+    register_json_provider(app)
+
+    _configure_templates(app)
+
+    # Create the upload folders now rather than on the first upload
+    from utils.file_handler import ensure_upload_folders
+    ensure_upload_folders()
+
     return app
 
 
 if __name__ == '__main__':
     app = create_app()
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
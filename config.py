@@ -1,5 +1,6 @@
 # config.py - Configuration settings
 import os
+import sys
 
 
 class Config:
@@ -9,6 +10,34 @@ class Config:
     DB_SERVER = 'CHILOO\\SQLEXPRESS'
     DB_NAME = 'Bright_Star'
 
+    # Connection pool settings
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))  # Idle connections kept open
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))  # Extra connections allowed under load
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # Seconds to wait for a free connection
+    DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 32))  # Prepared cursors kept per connection
+
+    # Log a warning when one request runs more queries than this (0 disables; for spotting N+1s in development)
+    DB_QUERY_WARN_THRESHOLD = int(os.environ.get('DB_QUERY_WARN_THRESHOLD', 0))
+    # Log a warning for any single statement slower than this many milliseconds (0 disables)
+    DB_SLOW_QUERY_MS = int(os.environ.get('DB_SLOW_QUERY_MS', 0))
+
+    # URL prefix of an nginx "internal" location aliased to static/uploads/students/;
+    # when set, student photos are handed to nginx with X-Accel-Redirect
+    PHOTO_ACCEL_PREFIX = os.environ.get('PHOTO_ACCEL_PREFIX', '')
+    # Same for teacher photos, with the internal location aliased to static/photos/teachers/
+    TEACHER_PHOTO_ACCEL_PREFIX = os.environ.get('TEACHER_PHOTO_ACCEL_PREFIX', '')
+
+    # Largest request body accepted, in bytes; bigger uploads get 413 before
+    # they are read (0 disables the limit)
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+
+    # Directory for compiled Jinja bytecode, so restarted workers skip re-parsing
+    # templates (empty disables)
+    TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR', '')
+
+    # ODBC Driver Manager pooling (off by default on Linux, see database.py)
+    ODBC_POOLING = os.environ.get('ODBC_POOLING', str(sys.platform == 'win32')).lower() in ('1', 'true', 'yes')
+
     # Primary connection string with timeout settings
     DB_CONNECTION_STRING = (
         f"DRIVER={{ODBC Driver 17 for SQL Server}};"
@@ -21,7 +50,7 @@ class Config:
     )
 
     # Backup connection strings to try if primary fails
-    BACKUP_CONNECTION_STRINGS = [
+    BACKUP_CONNECTION_STRINGS = (
         # Option 1: Using (local) instead of computer name
         (
             f"DRIVER={{ODBC Driver 17 for SQL Server}};"
@@ -62,7 +91,7 @@ class Config:
             f"Connection Timeout=30;"
             f"Login Timeout=30;"
         ),
-    ]
+    )
 
 
 class DevelopmentConfig(Config):
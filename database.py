@@ -1,11 +1,48 @@
 # database.py - Database connection and utilities
 import pyodbc
 import logging
+import queue
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
 from contextlib import contextmanager
+from functools import lru_cache
+from flask import g, has_app_context
 from config import Config
+from utils.cache import ttl_cache
 
 logger = logging.getLogger(__name__)
 
+# Let the ODBC Driver Manager pool connection handles so that connections
+# closed by our own pool (overflow, errors) are cheap to reopen. This must be
+# set before the first pyodbc.connect. On Linux it is off by default because
+# unixODBC releases before 2.3.12 leak memory with pooling enabled (iconv leak).
+pyodbc.pooling = Config.ODBC_POOLING
+
+# ODBC drivers installed on this machine, looked up once at import so that
+# connection strings naming a missing driver are skipped instead of timing out
+_AVAILABLE_DRIVERS = frozenset(pyodbc.drivers())
+_DRIVER_PATTERN = re.compile(r'DRIVER=\{([^}]*)\}', re.IGNORECASE)
+
+
+def _driver_available(conn_str):
+    """Check whether the ODBC driver named in a connection string is installed"""
+    match = _DRIVER_PATTERN.search(conn_str)
+    if not match or not _AVAILABLE_DRIVERS:
+        return True
+    return match.group(1) in _AVAILABLE_DRIVERS
+
+
+_BACKUP_CONNECTION_STRINGS = tuple(
+    conn_str for conn_str in Config.BACKUP_CONNECTION_STRINGS if _driver_available(conn_str)
+)
+
+# Connection string that last connected successfully; once set, new
+# connections use it directly instead of re-probing the alternatives
+_WORKING_CONN_STR = None
+_CONN_STR_LOCK = threading.Lock()
+
 
 def test_connection(conn_str, timeout=10):
     """Test a single connection string"""
@@ -27,15 +64,35 @@ def test_connection(conn_str, timeout=10):
 
 
 def get_working_connection_string():
-    """Find a working connection string"""
+    """Find a working connection string (probed once, then cached)"""
+    global _WORKING_CONN_STR
+    if _WORKING_CONN_STR:
+        return _WORKING_CONN_STR
+
+    # Only one thread probes; the rest wait and reuse its result
+    with _CONN_STR_LOCK:
+        if not _WORKING_CONN_STR:
+            _WORKING_CONN_STR = _probe_connection_strings()
+        return _WORKING_CONN_STR
+
+
+def reset_connection_cache():
+    """Forget the cached connection string so the next connect probes again"""
+    global _WORKING_CONN_STR
+    with _CONN_STR_LOCK:
+        _WORKING_CONN_STR = None
+
+
+def _probe_connection_strings():
+    """Test the primary and backup connection strings in order"""
     # Try primary connection string first
-    if test_connection(Config.DB_CONNECTION_STRING):
+    if _driver_available(Config.DB_CONNECTION_STRING) and test_connection(Config.DB_CONNECTION_STRING):
         logger.info("Using primary connection string")
         return Config.DB_CONNECTION_STRING
 
     # Try backup connection strings
     logger.info("Primary connection failed, trying backup options...")
-    for i, backup_conn_str in enumerate(Config.BACKUP_CONNECTION_STRINGS, 1):
+    for i, backup_conn_str in enumerate(_BACKUP_CONNECTION_STRINGS, 1):
         logger.info(f"Trying backup connection {i}...")
         if test_connection(backup_conn_str):
             logger.info(f"✅ Backup connection {i} successful!")
@@ -57,41 +114,213 @@ def get_working_connection_string():
 #         print_diagnostics()
 #         raise
 
-# Database connection settings
+# Connection pool: idle connections are reused (LIFO keeps the most recently
+# used one on top) and the semaphore caps how many can be checked out at once
+_POOL = queue.LifoQueue(maxsize=Config.DB_POOL_SIZE)
+_POOL_SLOTS = threading.BoundedSemaphore(Config.DB_POOL_SIZE + Config.DB_MAX_OVERFLOW)
+
+# Long-lived cursors per pooled connection, keyed by id(conn) and then by SQL
+# text. pyodbc keeps the last statement prepared on a cursor and skips
+# SQLPrepare when the same text runs again, so giving each hot statement its
+# own cursor keeps it prepared even when other queries run in between.
+# Each connection keeps its most recently used DB_STATEMENT_CACHE_SIZE cursors.
+_CURSORS = {}
+
+
+def _connect():
+    """Open a new database connection using Config settings"""
+    global _WORKING_CONN_STR
+    if _WORKING_CONN_STR:
+        return pyodbc.connect(_WORKING_CONN_STR, autocommit=False)
+
+    with _CONN_STR_LOCK:
+        if _WORKING_CONN_STR:
+            return pyodbc.connect(_WORKING_CONN_STR, autocommit=False)
+
+        conn_str = f'DRIVER={{ODBC Driver 17 for SQL Server}}; SERVER={Config.DB_SERVER}; DATABASE={Config.DB_NAME}; Trusted_Connection=yes'
+        conn = None
+        if _driver_available(conn_str):
+            try:
+                conn = pyodbc.connect(conn_str, autocommit=False)
+            except Exception:
+                conn = None
+
+        if conn is None:
+            # Fallback to older driver if ODBC Driver 17 is not available
+            conn_str = f'DRIVER={{SQL Server}}; SERVER={Config.DB_SERVER}; DATABASE={Config.DB_NAME}; Trusted_Connection=yes'
+            conn = pyodbc.connect(conn_str, autocommit=False)
+
+        # Remember which driver worked so later connects skip the failed attempt
+        _WORKING_CONN_STR = conn_str
+        return conn
+
+
 def get_db():
-    """Get database connection using Config settings"""
-    conn_str = f'DRIVER={{ODBC Driver 17 for SQL Server}}; SERVER={Config.DB_SERVER}; DATABASE={Config.DB_NAME}; Trusted_Connection=yes'
+    """Check out a database connection from the pool"""
+    if not _POOL_SLOTS.acquire(timeout=Config.DB_POOL_TIMEOUT):
+        raise Exception("Timed out waiting for a free database connection")
+
     try:
-        conn = pyodbc.connect(conn_str)
-        return conn
+        return _POOL.get_nowait()
+    except queue.Empty:
+        pass
+
+    try:
+        return _configure_connection(_connect())
     except Exception:
-        # Fallback to older driver if ODBC Driver 17 is not available
-        fallback_conn_str = f'DRIVER={{SQL Server}}; SERVER={Config.DB_SERVER}; DATABASE={Config.DB_NAME}; Trusted_Connection=yes'
-        conn = pyodbc.connect(fallback_conn_str)
-        return conn
+        _POOL_SLOTS.release()
+        raise
+
+
+def _configure_connection(conn):
+    """One-time setup for a newly opened connection"""
+    conn.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-16le')
+    return conn
+
+
+def get_cursor(conn, sql=None):
+    """Get the cached cursor for a connection and SQL text, creating it on first use"""
+    if Config.DB_QUERY_WARN_THRESHOLD and sql and has_app_context():
+        g.setdefault('_db_queries', []).append(sql)
+
+    cursors = _CURSORS.get(id(conn))
+    if cursors is None:
+        cursors = _CURSORS[id(conn)] = OrderedDict()
+
+    cursor = cursors.get(sql)
+    if cursor is not None:
+        cursors.move_to_end(sql)
+        return cursor
+
+    cursor = conn.cursor()
+    cursor.fast_executemany = True
+    cursors[sql] = cursor
+    if len(cursors) > Config.DB_STATEMENT_CACHE_SIZE:
+        _, evicted = cursors.popitem(last=False)
+        try:
+            evicted.close()
+        except pyodbc.Error:
+            pass
+    return cursor
+
+
+def _execute(cursor, query, params=None):
+    """Run a statement on a cursor, logging it if it exceeds DB_SLOW_QUERY_MS"""
+    if not Config.DB_SLOW_QUERY_MS:
+        return cursor.execute(query, params) if params else cursor.execute(query)
+
+    started = time.perf_counter()
+    try:
+        return cursor.execute(query, params) if params else cursor.execute(query)
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > Config.DB_SLOW_QUERY_MS:
+            logger.warning(f"Slow query ({elapsed_ms:.0f} ms): {' '.join(query.split())[:200]}")
+
+
+def _drain(cursor):
+    """Discard a cursor's unread rows and result sets
+
+    The connection strings don't enable MARS, so SQL Server allows one pending
+    result set per connection. A cached cursor left holding one would make the
+    next statement on any other cursor fail with "Connection is busy with
+    results for another hstmt".
+    """
+    while cursor.nextset():
+        pass
+
+
+def release_db(conn, discard=False):
+    """Return a connection to the pool, closing it if discarded or the pool is full"""
+    try:
+        if not discard:
+            try:
+                # Reset any open transaction before the connection is reused
+                conn.rollback()
+                _POOL.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+            except pyodbc.Error as e:
+                # A connection that cannot roll back is poisoned; close it instead
+                logger.warning(f"Rollback failed, discarding pooled connection: {str(e)}")
+
+        _CURSORS.pop(id(conn), None)
+        try:
+            conn.close()
+        except pyodbc.Error as e:
+            logger.warning(f"Closing database connection failed: {str(e)}")
+    finally:
+        _POOL_SLOTS.release()
 
 
 @contextmanager
-def get_db_connection():
-    """Context manager for database connections"""
+def get_db_connection(shared=True):
+    """Context manager for pooled database connections
+
+    Inside a Flask request the connection is checked out once and reused by
+    every query in that request, then returned by close_request_db on
+    teardown. Pass shared=False to always take a separate connection.
+    """
+    if shared and has_app_context():
+        with _request_connection() as conn:
+            yield conn
+        return
+
     conn = None
+    failed = False
     try:
         conn = get_db()
         yield conn
     except Exception as e:
         logger.error(f"Database error: {str(e)}")
-        if conn:
-            try:
-                conn.rollback()
-            except:
-                pass
+        failed = True
         raise
     finally:
         if conn:
-            try:
-                conn.close()
-            except:
-                pass
+            # Connections that raised are closed rather than returned to the pool
+            release_db(conn, discard=failed)
+
+
+@contextmanager
+def _request_connection():
+    """The current request's connection, checked out on first use"""
+    conn = g.get('_db_conn')
+    if conn is None:
+        conn = g._db_conn = get_db()
+
+    try:
+        yield conn
+    except Exception as e:
+        logger.error(f"Database error: {str(e)}")
+        try:
+            # Keep using the connection for the rest of the request if it can
+            # still roll back (e.g. after a SQL error); otherwise drop it now
+            conn.rollback()
+        except pyodbc.Error:
+            g.pop('_db_conn', None)
+            release_db(conn, discard=True)
+        raise
+
+
+def close_request_db(exception=None):
+    """Return the request's connection to the pool (registered as a teardown handler)"""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        release_db(conn)
+
+
+def report_request_queries(exception=None):
+    """Warn about requests over DB_QUERY_WARN_THRESHOLD queries (registered as a teardown handler)"""
+    queries = g.pop('_db_queries', None)
+    if not queries or len(queries) <= Config.DB_QUERY_WARN_THRESHOLD:
+        return
+
+    # The same statement repeated many times is the usual sign of an N+1 loop
+    sql, repeats = Counter(queries).most_common(1)[0]
+    logger.warning(
+        f"{len(queries)} queries in one request; most repeated ({repeats}x): {' '.join(sql.split())[:200]}"
+    )
 
 
 def init_db():
@@ -103,9 +332,10 @@ def init_db():
             logger.info("✅ Database connection successful")
 
             # Test a simple query
-            cursor = conn.cursor()
+            cursor = get_cursor(conn)
             cursor.execute("SELECT GETDATE()")
             result = cursor.fetchone()
+            _drain(cursor)
             logger.info(f"✅ Database query test successful. Server time: {result[0]}")
 
     except Exception as e:
@@ -113,26 +343,83 @@ def init_db():
         raise
 
 
-def query_db(query, params=None, fetchone=False):
-    """Execute a query and return results"""
+def escape_like(text):
+    """Escape LIKE wildcards (%, _ and [) so user input matches literally"""
+    return text.replace('[', '[[]').replace('%', '[%]').replace('_', '[_]')
+
+
+def has_fulltext_index(table):
+    """Whether full-text search is installed and ``table`` has a full-text index
+
+    Probed once an hour per table, so queries can choose CONTAINS or LIKE up
+    front instead of trying CONTAINS and failing on every call.
+    """
+    try:
+        return _fulltext_indexed(table)
+    except pyodbc.Error as e:
+        logger.warning(f"Could not check full-text index on {table}: {str(e)}")
+        return False
+
+
+@ttl_cache(3600, 32)
+def _fulltext_indexed(table):
+    query = """
+        SELECT CASE WHEN FULLTEXTSERVERPROPERTY('IsFullTextInstalled') = 1
+            AND EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID(?))
+        THEN 1 ELSE 0 END
+    """
+    return bool(query_db(query, (table,), namedtuples=True)[0][0])
+
+
+def has_column(table, column):
+    """Whether ``table`` has ``column`` (e.g. an optional computed column), probed once an hour"""
+    try:
+        return _column_exists(table, column)
+    except pyodbc.Error as e:
+        logger.warning(f"Could not check for column {table}.{column}: {str(e)}")
+        return False
+
+
+@ttl_cache(3600, 64)
+def _column_exists(table, column):
+    query = "SELECT CASE WHEN COL_LENGTH(?, ?) IS NOT NULL THEN 1 ELSE 0 END"
+    return bool(query_db(query, (table, column), namedtuples=True)[0][0])
+
+
+@lru_cache(maxsize=256)
+def _row_class(columns):
+    """Namedtuple row type for a column tuple, built once per distinct result shape"""
+    return namedtuple('Row', columns, rename=True)
+
+
+def query_db(query, params=None, fetchone=False, namedtuples=False):
+    """Execute a query and return results
+
+    Rows are dicts by default; pass namedtuples=True to get lighter rows
+    that support both row.Column and positional row[0] access.
+    """
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
+            cursor = get_cursor(conn, query)
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            _execute(cursor, query, params)
+
+            columns = tuple(column[0] for column in cursor.description)
 
             if fetchone:
                 result = cursor.fetchone()
+                _drain(cursor)
                 if result:
-                    columns = [column[0] for column in cursor.description]
+                    if namedtuples:
+                        return _row_class(columns)._make(result)
                     return dict(zip(columns, result))
                 return None
             else:
                 results = cursor.fetchall()
-                columns = [column[0] for column in cursor.description]
+                _drain(cursor)
+                if namedtuples:
+                    make_row = _row_class(columns)._make
+                    return [make_row(row) for row in results]
                 return [dict(zip(columns, row)) for row in results]
 
     except Exception as e:
@@ -142,21 +429,124 @@ def query_db(query, params=None, fetchone=False):
         raise
 
 
+def query_db_sets(query, params=None):
+    """Execute a batch of SELECT statements and return one list of namedtuple rows per result set
+
+    The whole batch is a single round trip on one connection.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = get_cursor(conn, query)
+
+            _execute(cursor, query, params)
+
+            result_sets = []
+            while True:
+                # Statements that return no rows (e.g. row counts) have no description
+                if cursor.description is not None:
+                    make_row = _row_class(tuple(column[0] for column in cursor.description))._make
+                    result_sets.append([make_row(row) for row in cursor.fetchall()])
+                if not cursor.nextset():
+                    break
+            return result_sets
+
+    except Exception as e:
+        logger.error(f"Query execution failed: {str(e)}")
+        logger.error(f"Query: {query}")
+        logger.error(f"Params: {params}")
+        raise
+
+
+def query_db_columnar(query, params=None):
+    """Execute a query and return results as {column: [values]}"""
+    try:
+        with get_db_connection() as conn:
+            cursor = get_cursor(conn, query)
+
+            _execute(cursor, query, params)
+
+            columns = [column[0] for column in cursor.description]
+            results = cursor.fetchall()
+            _drain(cursor)
+            if not results:
+                return {column: [] for column in columns}
+            return {column: list(values) for column, values in zip(columns, zip(*results))}
+
+    except Exception as e:
+        logger.error(f"Query execution failed: {str(e)}")
+        logger.error(f"Query: {query}")
+        logger.error(f"Params: {params}")
+        raise
+
+
+def query_db_iter(query, params=None, batch_size=1000):
+    """Execute a query and yield result rows as dicts, one at a time
+
+    The connection stays checked out until the generator is exhausted or closed.
+    """
+    # A separate connection: other queries can't run on one with a pending result set
+    with get_db_connection(shared=False) as conn:
+        cursor = get_cursor(conn, query)
+        cursor.arraysize = batch_size
+
+        try:
+            _execute(cursor, query, params)
+        except Exception as e:
+            logger.error(f"Query execution failed: {str(e)}")
+            logger.error(f"Query: {query}")
+            logger.error(f"Params: {params}")
+            raise
+
+        columns = tuple(column[0] for column in cursor.description)
+        try:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            # Also runs when the caller stops early, before the connection is pooled again
+            _drain(cursor)
+
+
 def execute_db(query, params=None, commit=True):
     """Execute a query (INSERT, UPDATE, DELETE)"""
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
+            cursor = get_cursor(conn, query)
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            _execute(cursor, query, params)
+            rowcount = cursor.rowcount
+            _drain(cursor)
+
+            if commit:
+                conn.commit()
+
+            return rowcount
+
+    except Exception as e:
+        logger.error(f"Query execution failed: {str(e)}")
+        logger.error(f"Query: {query}")
+        logger.error(f"Params: {params}")
+        raise
+
+
+def execute_returning(query, params=None, commit=True):
+    """Execute an INSERT ... OUTPUT INSERTED.<column> and return the output value"""
+    try:
+        with get_db_connection() as conn:
+            cursor = get_cursor(conn, query)
+
+            _execute(cursor, query, params)
+
+            row = cursor.fetchone()
+            _drain(cursor)
 
             if commit:
                 conn.commit()
 
-            return cursor.rowcount
+            return row[0] if row else None
 
     except Exception as e:
         logger.error(f"Query execution failed: {str(e)}")
@@ -165,6 +555,27 @@ def execute_db(query, params=None, commit=True):
         raise
 
 
+def executemany_db(query, params_list, commit=True):
+    """Execute a query for each parameter set in a single batch"""
+    try:
+        with get_db_connection() as conn:
+            cursor = get_cursor(conn, query)
+            cursor.executemany(query, params_list)
+            rowcount = cursor.rowcount
+            _drain(cursor)
+
+            if commit:
+                conn.commit()
+
+            return rowcount
+
+    except Exception as e:
+        logger.error(f"Batch execution failed: {str(e)}")
+        logger.error(f"Query: {query}")
+        logger.error(f"Rows: {len(params_list)}")
+        raise
+
+
 def print_diagnostics():
     """Print diagnostic information"""
     print("\n" + "=" * 50)
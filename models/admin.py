@@ -1,20 +1,39 @@
 # models/admin.py - Admin model for MSSQL
-from database import query_db, execute_db
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from database import query_db, execute_db, has_fulltext_index, has_column
+from utils.security import verify_password, verify_dummy_password
+import logging
+import pyodbc
+
+logger = logging.getLogger(__name__)
 
 
 class Admin:
+    # Cached result of any_exists(); only a positive answer is kept
+    _exists = False
+
     @staticmethod
     def get_all():
         """Get all admin records"""
-        query = "SELECT * FROM Admins_114 WHERE IsActive = 1 ORDER BY CreatedAt DESC"
+        query = '''
+            SELECT AdminID, FirstName, LastName, Email, IsActive, LastLogin, CreatedAt, UpdatedAt
+            FROM Admins_114 WHERE IsActive = 1 ORDER BY CreatedAt DESC
+        '''
         return query_db(query)
 
+    @staticmethod
+    def any_exists():
+        """Check whether at least one active admin exists"""
+        # Once true it stays true for this process until an admin is removed
+        if Admin._exists:
+            return True
+        query = "SELECT CASE WHEN EXISTS (SELECT 1 FROM Admins_114 WHERE IsActive = 1) THEN 1 ELSE 0 END AS found"
+        Admin._exists = bool(query_db(query)[0]['found'])
+        return Admin._exists
+
     @staticmethod
     def get_by_id(admin_id):
         """Get admin by ID"""
-        query = "SELECT * FROM Admins_114 WHERE AdminID = ? AND IsActive = 1"
+        query = "SELECT AdminID, FirstName, LastName, Email FROM Admins_114 WHERE AdminID = ? AND IsActive = 1"
         results = query_db(query, (admin_id,))
         return results[0] if results else None
 
@@ -25,16 +44,29 @@ class Admin:
         results = query_db(query, (email,))
         return results[0] if results else None
 
+    @staticmethod
+    def _get_with_password(email):
+        """Get the login fields of an admin, including the password hash"""
+        query = '''
+            SELECT AdminID, FirstName, LastName, Email, Password
+            FROM Admins_114 WHERE Email = ? AND IsActive = 1
+        '''
+        results = query_db(query, (email,))
+        return results[0] if results else None
+
     @staticmethod
     def email_exists(email):
         """Check if email already exists"""
-        query = "SELECT COUNT(*) as count FROM Admins_114 WHERE Email = ?"
+        # EXISTS stops at the first match; with a unique index on Email this is a single seek
+        query = "SELECT CASE WHEN EXISTS (SELECT 1 FROM Admins_114 WHERE Email = ?) THEN 1 ELSE 0 END AS found"
         result = query_db(query, (email,))
-        return result[0]['count'] > 0 if result else False
+        return result[0]['found'] == 1 if result else False
 
     @staticmethod
     def create(data):
         """Create a new admin"""
+        from werkzeug.security import generate_password_hash
+
         # Hash the password
         hashed_password = generate_password_hash(data['Password'])
 
@@ -48,46 +80,59 @@ class Admin:
             data['Email'],
             hashed_password
         ))
+        Admin._exists = True
 
     @staticmethod
     def update(admin_id, data):
         """Update admin information"""
         # If password is being updated, hash it
-        if 'Password' in data:
-            data['Password'] = generate_password_hash(data['Password'])
+        password = data.get('Password')
+        if password:
+            from werkzeug.security import generate_password_hash
+            password = generate_password_hash(password)
 
-        # Build dynamic update query
-        fields = []
-        values = []
-        for key, value in data.items():
-            if key != 'AdminID':  # Don't update the ID
-                fields.append(f"{key} = ?")
-                values.append(value)
-
-        # Add UpdatedAt timestamp
-        fields.append("UpdatedAt = GETDATE()")
-        values.append(admin_id)  # For WHERE clause
-
-        query = f"UPDATE Admins_114 SET {', '.join(fields)} WHERE AdminID = ?"
-        execute_db(query, values)
+        # Fixed SQL text so SQL Server reuses one cached plan; NULL keeps the current value
+        query = '''
+            UPDATE Admins_114
+            SET FirstName = COALESCE(?, FirstName),
+                LastName = COALESCE(?, LastName),
+                Email = COALESCE(?, Email),
+                Password = COALESCE(?, Password),
+                IsActive = COALESCE(?, IsActive),
+                UpdatedAt = GETDATE()
+            WHERE AdminID = ?
+        '''
+        execute_db(query, (
+            data.get('FirstName'),
+            data.get('LastName'),
+            data.get('Email'),
+            password or None,
+            data.get('IsActive'),
+            admin_id
+        ))
 
     @staticmethod
     def delete(admin_id):
         """Soft delete admin (set IsActive to 0)"""
         query = "UPDATE Admins_114 SET IsActive = 0, UpdatedAt = GETDATE() WHERE AdminID = ?"
         execute_db(query, (admin_id,))
+        Admin._exists = False
 
     @staticmethod
     def hard_delete(admin_id):
         """Permanently delete admin"""
         query = "DELETE FROM Admins_114 WHERE AdminID = ?"
         execute_db(query, (admin_id,))
+        Admin._exists = False
 
     @staticmethod
     def authenticate(email, password):
         """Authenticate admin login"""
-        admin = Admin.get_by_email(email)
-        if admin and check_password_hash(admin['Password'], password):
+        admin = Admin._get_with_password(email)
+        if not admin:
+            verify_dummy_password(password)
+            return None
+        if verify_password(admin['Password'], password):
             # Update last login time
             Admin.update_last_login(admin['AdminID'])
             return admin
@@ -102,6 +147,8 @@ class Admin:
     @staticmethod
     def change_password(admin_id, new_password):
         """Change admin password"""
+        from werkzeug.security import generate_password_hash
+
         hashed_password = generate_password_hash(new_password)
         query = "UPDATE Admins_114 SET Password = ?, UpdatedAt = GETDATE() WHERE AdminID = ?"
         execute_db(query, (hashed_password, admin_id))
@@ -117,6 +164,7 @@ class Admin:
         """Deactivate admin account"""
         query = "UPDATE Admins_114 SET IsActive = 0, UpdatedAt = GETDATE() WHERE AdminID = ?"
         execute_db(query, (admin_id,))
+        Admin._exists = False
 
     @staticmethod
     def get_active_count():
@@ -128,29 +176,64 @@ class Admin:
     @staticmethod
     def search(search_term, limit=50):
         """Search admins by name or email"""
+        # Prefix search through the full-text index on (FirstName, LastName, Email),
+        # when the database has it:
+        #   CREATE FULLTEXT INDEX ON Admins_114(FirstName, LastName, Email) KEY INDEX PK_Admins_114
+        # Substring fallback through one indexed computed column instead of three LIKEs,
+        # when the database has it:
+        #   ALTER TABLE Admins_114 ADD SearchBlob AS (LOWER(FirstName + ' ' + LastName + ' ' + Email)) PERSISTED
+        #   CREATE INDEX IX_Admins_Search ON Admins_114(SearchBlob)
+        if has_fulltext_index('Admins_114'):
+            try:
+                query = '''
+                    SELECT TOP (?) AdminID, FirstName, LastName, Email, IsActive, LastLogin, CreatedAt, UpdatedAt
+                    FROM Admins_114
+                    WHERE IsActive = 1
+                    AND CONTAINS((FirstName, LastName, Email), ?)
+                    ORDER BY FirstName, LastName
+                '''
+                fulltext_term = '"{}*"'.format(search_term.replace('"', '""'))
+                return query_db(query, (limit, fulltext_term))
+            except pyodbc.Error as e:
+                # e.g. a search term the full-text parser rejects
+                logger.warning(f"Full-text admin search failed, using LIKE fallback: {str(e)}")
+
+        if has_column('Admins_114', 'SearchBlob'):
+            query = '''
+                SELECT AdminID, FirstName, LastName, Email, IsActive, LastLogin, CreatedAt, UpdatedAt
+                FROM Admins_114
+                WHERE IsActive = 1 AND SearchBlob LIKE ?
+                ORDER BY FirstName, LastName
+                OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+            '''
+            search_pattern = f"%{search_term.lower()}%"
+            return query_db(query, (search_pattern, limit))
+
         query = '''
-            SELECT * FROM Admins_114 
-            WHERE IsActive = 1 
+            SELECT AdminID, FirstName, LastName, Email, IsActive, LastLogin, CreatedAt, UpdatedAt
+            FROM Admins_114
+            WHERE IsActive = 1
             AND (FirstName LIKE ? OR LastName LIKE ? OR Email LIKE ?)
             ORDER BY FirstName, LastName
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
         '''
         search_pattern = f"%{search_term}%"
-        return query_db(query, (search_pattern, search_pattern, search_pattern))
+        return query_db(query, (search_pattern, search_pattern, search_pattern, limit))
 
 
 # Helper function to create the first admin if none exist
 def create_first_admin_if_needed():
     """Create first admin if no admins exist"""
     try:
-        if Admin.get_active_count() == 0:
+        if not Admin.any_exists():
             Admin.create({
                 'FirstName': 'System',
                 'LastName': 'Administrator',
                 'Email': 'admin@brightstar.edu',
                 'Password': 'admin123'
             })
-            print("First admin created: admin@brightstar.edu / admin123")
+            logger.info("First admin created: admin@brightstar.edu")
             return True
     except Exception as e:
-        print(f"Error creating first admin: {e}")
+        logger.exception(f"Error creating first admin: {e}")
     return False
\ No newline at end of file
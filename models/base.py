@@ -0,0 +1,67 @@
+# models/base.py - Generated CRUD for simple single-table models
+from database import query_db, execute_db, execute_returning
+from utils.cache import ttl_cache
+
+
+def crud_model(table, pk, cols, order_by, update_cols=None, on_write=None, cache_ttl=None, read_only_cols=()):
+    """Class decorator adding get_all/get_by_id/create/update/delete
+
+    The SQL for each operation is built once, when the model module is
+    imported, and stored on the class. Methods the class defines itself
+    are left untouched. ``on_write`` is called with no arguments after every
+    successful create/update/delete, e.g. to drop dependent caches. With
+    ``cache_ttl`` set, get_all() results are kept for that many seconds and
+    dropped by this process's own writes. ``read_only_cols`` are selected
+    by get_all/get_by_id but never written.
+    """
+    update_cols = tuple(update_cols or cols)
+    select_cols = ', '.join((pk,) + tuple(cols) + tuple(read_only_cols))
+
+    def decorate(cls):
+        cls.TABLE = table
+        cls.PK = pk
+        cls.COLUMNS = tuple(cols)
+        cls.UPDATE_COLUMNS = update_cols
+
+        cls.SELECT_ALL_SQL = f"SELECT {select_cols} FROM {table} ORDER BY {order_by}"
+        cls.SELECT_BY_ID_SQL = f"SELECT {select_cols} FROM {table} WHERE {pk} = ?"
+        cls.INSERT_SQL = (
+            f"INSERT INTO {table} ({', '.join(cols)}) OUTPUT INSERTED.{pk} "
+            f"VALUES ({', '.join('?' * len(cols))})"
+        )
+        cls.UPDATE_SQL = f"UPDATE {table} SET {', '.join(f'{col} = ?' for col in update_cols)} WHERE {pk} = ?"
+        cls.DELETE_SQL = f"DELETE FROM {table} WHERE {pk} = ?"
+
+        def get_all():
+            return query_db(cls.SELECT_ALL_SQL)
+
+        if cache_ttl:
+            get_all = ttl_cache(cache_ttl, maxsize=1)(get_all)
+
+        def get_by_id(record_id):
+            results = query_db(cls.SELECT_BY_ID_SQL, (record_id,))
+            return results[0] if results else None
+
+        def written(result):
+            if cache_ttl:
+                get_all.cache_clear()
+            if on_write:
+                on_write()
+            return result
+
+        def create(data):
+            return written(execute_returning(cls.INSERT_SQL, tuple(data[col] for col in cls.COLUMNS)))
+
+        def update(record_id, data):
+            params = tuple(data[col] for col in cls.UPDATE_COLUMNS) + (record_id,)
+            return written(execute_db(cls.UPDATE_SQL, params))
+
+        def delete(record_id):
+            return written(execute_db(cls.DELETE_SQL, (record_id,)))
+
+        for method in (get_all, get_by_id, create, update, delete):
+            if method.__name__ not in cls.__dict__:
+                setattr(cls, method.__name__, staticmethod(method))
+        return cls
+
+    return decorate
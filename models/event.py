@@ -1,47 +1,17 @@
 # models/event.py - Event model
-from database import query_db, execute_db
+from database import query_db_iter
+from models.base import crud_model
 
-class Event:
-    @staticmethod
-    def get_all():
-        query = "SELECT * FROM Events ORDER BY EventDate DESC"
-        return query_db(query)
-
-    @staticmethod
-    def get_by_id(event_id):
-        query = "SELECT * FROM Events WHERE EventID = ?"
-        results = query_db(query, (event_id,))
-        return results[0] if results else None
-
-    @staticmethod
-    def create(data):
-        query = '''
-            INSERT INTO Events (Title, Description, EventDate, Location)
-            VALUES (?, ?, ?, ?)
-        '''
-        execute_db(query, (
-            data['Title'],
-            data['Description'],
-            data['EventDate'],
-            data['Location']
-        ))
-
-    @staticmethod
-    def update(event_id, data):
-        query = '''
-            UPDATE Events
-            SET Title = ?, Description = ?, EventDate = ?, Location = ?
-            WHERE EventID = ?
-        '''
-        execute_db(query, (
-            data['Title'],
-            data['Description'],
-            data['EventDate'],
-            data['Location'],
-            event_id
-        ))
 
+@crud_model(
+    table='Events',
+    pk='EventID',
+    cols=('Title', 'Description', 'EventDate', 'Location'),
+    order_by='EventDate DESC',
+    read_only_cols=('Photo',)  # Shown by the list and view templates; not set by the forms
+)
+class Event:
     @staticmethod
-    def delete(event_id):
-        query = "DELETE FROM Events WHERE EventID = ?"
-        execute_db(query, (event_id,))
\ No newline at end of file
+    def iter_all():
+        """Stream all events without materializing the full result set"""
+        return query_db_iter(Event.SELECT_ALL_SQL)
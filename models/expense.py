@@ -1,38 +1,13 @@
 # models/expense.py
-from database import query_db, execute_db
+from models.base import crud_model
 
-class Expense:
-    @staticmethod
-    def get_all():
-        query = "SELECT * FROM Expenses_114 ORDER BY ExpenseDate DESC"
-        return query_db(query)
-
-    @staticmethod
-    def get_by_id(expense_id):
-        query = "SELECT * FROM Expenses_114 WHERE ExpenseID = ?"
-        results = query_db(query, (expense_id,))
-        return results[0] if results else None
-
-    @staticmethod
-    def create(data):
-        query = """
-            INSERT INTO Expenses_114 (Title, Amount, ExpenseDate, Category, Notes)
-            VALUES (?, ?, ?, ?, ?)
-        """
-        params = (data['Title'], data['Amount'], data['ExpenseDate'], data['Category'], data['Notes'])
-        return execute_db(query, params)
 
-    @staticmethod
-    def update(expense_id, data):
-        query = """
-            UPDATE Expenses_114
-            SET Title = ?, Amount = ?, ExpenseDate = ?, Category = ?, Notes = ?
-            WHERE ExpenseID = ?
-        """
-        params = (data['Title'], data['Amount'], data['ExpenseDate'], data['Category'], data['Notes'], expense_id)
-        return execute_db(query, params)
-
-    @staticmethod
-    def delete(expense_id):
-        query = "DELETE FROM Expenses_114 WHERE ExpenseID = ?"
-        return execute_db(query, (expense_id,))
\ No newline at end of file
+@crud_model(
+    table='Expenses_114',
+    pk='ExpenseID',
+    cols=('Title', 'Amount', 'ExpenseDate', 'Category', 'Notes'),
+    order_by='ExpenseDate DESC',
+    cache_ttl=10
+)
+class Expense:
+    pass
@@ -1,14 +1,63 @@
 # models/log.py - Log model
-from database import query_db, execute_db
-from datetime import datetime
+from database import query_db, query_db_iter, execute_db, executemany_db, has_fulltext_index
+from utils.cache import ttl_cache
+from datetime import datetime, timedelta
+import atexit
+import logging
+import pyodbc
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
 
 class Log:
+    # The filtered lists all read "WHERE <column> = ? ORDER BY Timestamp DESC" and
+    # stop after a few rows; with these indexes each is an ordered range scan that
+    # ends early instead of a filter followed by a sort:
+    #   CREATE INDEX IX_Logs_Action_Timestamp ON Logs_114(Action, Timestamp DESC)
+    #   CREATE INDEX IX_Logs_UserEmail_Timestamp ON Logs_114(UserEmail, Timestamp DESC)
+    #   CREATE INDEX IX_Logs_TableName_Timestamp ON Logs_114(TableName, Timestamp DESC)
+    #   CREATE INDEX IX_Logs_Timestamp ON Logs_114(Timestamp DESC)
+    # Check the plans with SET SHOWPLAN_XML ON (or "Include Actual Execution Plan"
+    # in SSMS) for an Index Seek with no Sort operator.
+    EXPORT_COLUMNS = ('LogID', 'UserEmail', 'Action', 'TableName', 'RecordID', 'Details', 'Timestamp')
+
+    # Log rows are buffered and written in batches by flush()
+    BATCH_SIZE = 200
+    DELETE_BATCH_SIZE = 10000  # Rows per transaction in delete_old_logs
+    FLUSH_INTERVAL = 1  # seconds
+    MAX_BUFFERED = 10000  # Oldest unwritten rows are dropped past this while the database is unreachable
+    INSERT_QUERY = '''
+        INSERT INTO Logs_114 (UserEmail, Action, TableName, RecordID, Details, Timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+
+    _buffer = []
+    _lock = threading.Lock()
+    _flusher = None
+
+    # Filter dropdown values, loaded once and then kept current by create();
+    # reloaded after FACETS_TTL seconds to pick up other workers' new values
+    FACETS_TTL = 3600
+    _facets = None
+    _facets_expires = 0
+
     @staticmethod
     def get_all(limit=100):
         """Get all logs with optional limit, ordered by most recent first"""
-        query = "SELECT * FROM Logs_114 ORDER BY Timestamp DESC LIMIT ?"
+        query = "SELECT * FROM Logs_114 ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
         return query_db(query, (limit,))
 
+    @staticmethod
+    def iter_all(limit=1000):
+        """Stream the most recent logs as dicts without materializing the full result set"""
+        query = f"""
+            SELECT {', '.join(Log.EXPORT_COLUMNS)} FROM Logs_114
+            ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        return query_db_iter(query, (limit,))
+
     @staticmethod
     def get_by_id(log_id):
         """Get a specific log entry by ID"""
@@ -19,19 +68,19 @@ class Log:
     @staticmethod
     def get_by_user(user_email, limit=50):
         """Get logs for a specific user"""
-        query = "SELECT * FROM Logs_114 WHERE UserEmail = ? ORDER BY Timestamp DESC LIMIT ?"
+        query = "SELECT * FROM Logs_114 WHERE UserEmail = ? ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
         return query_db(query, (user_email, limit))
 
     @staticmethod
     def get_by_action(action, limit=50):
         """Get logs for a specific action type"""
-        query = "SELECT * FROM Logs_114 WHERE Action = ? ORDER BY Timestamp DESC LIMIT ?"
+        query = "SELECT * FROM Logs_114 WHERE Action = ? ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
         return query_db(query, (action, limit))
 
     @staticmethod
     def get_by_table(table_name, limit=50):
         """Get logs for a specific table"""
-        query = "SELECT * FROM Logs_114 WHERE TableName = ? ORDER BY Timestamp DESC LIMIT ?"
+        query = "SELECT * FROM Logs_114 WHERE TableName = ? ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
         return query_db(query, (table_name, limit))
 
     @staticmethod
@@ -39,37 +88,167 @@ class Log:
         """Get logs within a date range"""
         query = """
             SELECT * FROM Logs_114 
-            WHERE DATE(Timestamp) BETWEEN ? AND ? 
-            ORDER BY Timestamp DESC LIMIT ?
+            WHERE Timestamp >= ? AND Timestamp < DATEADD(day, 1, ?)
+            ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
         """
         return query_db(query, (start_date, end_date, limit))
 
+    @staticmethod
+    @ttl_cache(ttl=60, maxsize=4)
+    def get_recent_activity(limit=100):
+        """Get the last 24 hours of logs for the dashboard, cached for a minute"""
+        query = """
+            SELECT * FROM Logs_114
+            WHERE Timestamp >= DATEADD(hour, -24, GETDATE())
+            ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        return query_db(query, (limit,))
+
     @staticmethod
     def create(user_email, action, table_name, record_id=None, details=None):
-        """Create a new log entry"""
-        query = '''
-            INSERT INTO Logs_114 (UserEmail, Action, TableName, RecordID, Details, Timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        '''
+        """Queue a new log entry; it is written on the next batch flush"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        execute_db(query, (
-            user_email,
-            action,
-            table_name,
-            record_id,
-            details,
-            timestamp
-        ))
+        with Log._lock:
+            Log._buffer.append((
+                user_email,
+                action,
+                table_name,
+                record_id,
+                details,
+                timestamp
+            ))
+            batch_full = len(Log._buffer) >= Log.BATCH_SIZE
+            if Log._facets is not None:
+                for facet, value in (('actions', action), ('users', user_email), ('tables', table_name)):
+                    if value:
+                        Log._facets[facet].add(value)
+            if Log._flusher is None:
+                Log._flusher = threading.Thread(target=Log._flush_periodically, daemon=True)
+                Log._flusher.start()
+
+        if batch_full:
+            # The caller's own write has already committed; don't fail it over the audit log
+            try:
+                Log.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush activity logs: {e}")
+
+    @staticmethod
+    def flush():
+        """Write all buffered log entries in a single batch
+
+        If the insert fails the rows go back to the front of the buffer for
+        the next flush, and the error is raised.
+        """
+        with Log._lock:
+            rows, Log._buffer = Log._buffer, []
+        if not rows:
+            return
+
+        try:
+            executemany_db(Log.INSERT_QUERY, rows)
+        except Exception:
+            with Log._lock:
+                Log._buffer[:0] = rows
+                dropped = len(Log._buffer) - Log.MAX_BUFFERED
+                if dropped > 0:
+                    del Log._buffer[:dropped]
+            if dropped > 0:
+                logger.error(f"Activity log buffer full; dropped {dropped} oldest entries")
+            raise
+
+    @staticmethod
+    def _flush_periodically():
+        """Background loop that flushes the buffer every FLUSH_INTERVAL seconds"""
+        while True:
+            time.sleep(Log.FLUSH_INTERVAL)
+            try:
+                Log.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush activity logs: {e}")
+
+    @staticmethod
+    def get_filter_facets():
+        """Distinct actions, users and tables for the filter dropdowns, as sorted lists
+
+        Served from memory; the database is only read on first use, after
+        FACETS_TTL, or after clear_caches().
+        """
+        now = time.monotonic()
+        with Log._lock:
+            facets = Log._facets if Log._facets_expires > now else None
+
+        if facets is None:
+            facets = Log._load_filter_facets()
+            with Log._lock:
+                Log._facets = facets
+                Log._facets_expires = now + Log.FACETS_TTL
+
+        with Log._lock:
+            return {facet: sorted(values) for facet, values in facets.items()}
+
+    @staticmethod
+    def _load_filter_facets():
+        """Read the facet value sets in one round trip, grouped by the server
+
+        Each GROUP BY is an ordered index-only scan of the matching
+        (<column>, Timestamp) index listed at the top of the class.
+        """
+        query = """
+            SELECT 'actions' AS Facet, Action AS Value FROM Logs_114 WHERE Action <> '' GROUP BY Action
+            UNION ALL
+            SELECT 'users', UserEmail FROM Logs_114 WHERE UserEmail <> '' GROUP BY UserEmail
+            UNION ALL
+            SELECT 'tables', TableName FROM Logs_114 WHERE TableName <> '' GROUP BY TableName
+        """
+        facets = {'actions': set(), 'users': set(), 'tables': set()}
+        for facet, value in query_db(query, namedtuples=True):
+            facets[facet].add(value)
+        return facets
 
     @staticmethod
     def delete_old_logs(days=90):
-        """Delete logs older than specified days"""
-        query = "DELETE FROM Logs_114 WHERE Timestamp < datetime('now', '-' || ? || ' days')"
-        execute_db(query, (days,))
+        """Delete logs older than specified days, DELETE_BATCH_SIZE rows per transaction
+
+        Short batches keep lock and transaction log growth bounded so other
+        writers aren't stalled behind one huge DELETE. Returns rows deleted.
+        """
+        query = "DELETE TOP (?) FROM Logs_114 WHERE Timestamp < ?"
+        cutoff = datetime.now() - timedelta(days=days)
+        deleted = 0
+        while True:
+            count = execute_db(query, (Log.DELETE_BATCH_SIZE, cutoff))
+            deleted += max(count, 0)
+            if count < Log.DELETE_BATCH_SIZE:
+                break
+        Log.clear_caches()
+        return deleted
+
+    @staticmethod
+    def delete_old_logs_in_background(days=90):
+        """Run delete_old_logs on a background thread so the request returns immediately"""
+        def run():
+            try:
+                deleted = Log.delete_old_logs(days)
+                logger.info(f"Log cleanup removed {deleted} entries older than {days} days")
+            except Exception as e:
+                logger.error(f"Log cleanup failed: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
 
     @staticmethod
+    def clear_caches():
+        """Drop the cached dashboard summaries and filter values"""
+        Log.get_activity_summary.cache_clear()
+        Log.get_user_activity_summary.cache_clear()
+        Log.get_recent_activity.cache_clear()
+        with Log._lock:
+            Log._facets = None
+
+    @staticmethod
+    @ttl_cache(ttl=300, maxsize=1)
     def get_activity_summary():
-        """Get summary of activities by action type"""
+        """Get summary of activities by action type (cached for 5 minutes)"""
         query = """
             SELECT Action, COUNT(*) as Count, MAX(Timestamp) as LastActivity
             FROM Logs_114 
@@ -79,8 +258,9 @@ class Log:
         return query_db(query)
 
     @staticmethod
+    @ttl_cache(ttl=300, maxsize=1)
     def get_user_activity_summary():
-        """Get summary of activities by user"""
+        """Get summary of activities by user (cached for 5 minutes)"""
         query = """
             SELECT UserEmail, COUNT(*) as Count, MAX(Timestamp) as LastActivity
             FROM Logs_114 
@@ -91,14 +271,35 @@ class Log:
 
     @staticmethod
     def search_logs(search_term, limit=50):
-        """Search logs by details or user email"""
+        """Search logs by details, user email or table name"""
+        # Word-prefix search through the full-text index, when the database has it,
+        # instead of scanning with '%term%':
+        #   CREATE FULLTEXT INDEX ON Logs_114(Details, UserEmail, TableName) KEY INDEX PK_Logs_114
+        if has_fulltext_index('Logs_114'):
+            try:
+                query = """
+                    SELECT * FROM Logs_114
+                    WHERE CONTAINS((Details, UserEmail, TableName), ?)
+                    ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+                """
+                fulltext_term = '"{}*"'.format(search_term.replace('"', '""'))
+                return query_db(query, (fulltext_term, limit))
+            except pyodbc.Error as e:
+                # e.g. a search term the full-text parser rejects
+                logger.warning(f"Full-text log search failed, using LIKE fallback: {str(e)}")
+
         query = """
             SELECT * FROM Logs_114 
-            WHERE Details LIKE ? OR UserEmail LIKE ? 
-            ORDER BY Timestamp DESC LIMIT ?
+            WHERE Details LIKE ? OR UserEmail LIKE ? OR TableName LIKE ?
+            ORDER BY Timestamp DESC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
         """
         search_pattern = f"%{search_term}%"
-        return query_db(query, (search_pattern, search_pattern, limit))
+        return query_db(query, (search_pattern, search_pattern, search_pattern, limit))
+
+
+# Write any buffered log entries before the process exits
+atexit.register(Log.flush)
+
 
 # Helper function to log system activities
 def log_activity(user_email, action, table_name, record_id=None, details=None):
@@ -107,5 +308,4 @@ def log_activity(user_email, action, table_name, record_id=None, details=None):
         Log.create(user_email, action, table_name, record_id, details)
     except Exception as e:
         # Log to system logger if database logging fails
-        import logging
-        logging.error(f"Failed to log activity: {e}")
\ No newline at end of file
+        logger.error(f"Failed to log activity: {e}")
\ No newline at end of file
@@ -1,65 +1,72 @@
 # models/result.py
-from database import query_db, execute_db
+from database import query_db
+from models.base import crud_model
+from models.student import Student
+from utils.pagination import encode_cursor, decode_cursor
 
-class Result:
-    @staticmethod
-    def get_all():
-        query = '''
-            SELECT * FROM Results_114 ORDER BY AcademicYear DESC, Term
-        '''
-        return query_db(query)
-
-    @staticmethod
-    def get_by_id(result_id):
-        query = "SELECT * FROM Results_114 WHERE ResultID = ?"
-        results = query_db(query, (result_id,))
-        return results[0] if results else None
 
+@crud_model(
+    table='Results_114',
+    pk='ResultID',
+    cols=('StudentID', 'AcademicYear', 'Term', 'Subject', 'Score', 'Grade', 'Remarks'),
+    order_by='AcademicYear DESC, Term',
+    update_cols=('AcademicYear', 'Term', 'Subject', 'Score', 'Grade', 'Remarks'),
+    on_write=Student.clear_results_cache
+)
+class Result:
     @staticmethod
     def get_by_student(student_id):
-        query = '''
-            SELECT * FROM Results_114
+        # Rows only carry the student's ID; routes that need the student's name
+        # fetch the student once on the same request connection, never per row
+        query = f'''
+            SELECT ResultID, {', '.join(Result.COLUMNS)} FROM Results_114
             WHERE StudentID = ?
             ORDER BY AcademicYear DESC, Term
         '''
         return query_db(query, (student_id,))
 
     @staticmethod
-    def create(data):
-        query = '''
-            INSERT INTO Results_114 (StudentID, AcademicYear, Term, Subject, Score, Grade, Remarks)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        '''
-        params = (
-            data['StudentID'],
-            data['AcademicYear'],
-            data['Term'],
-            data['Subject'],
-            data['Score'],
-            data['Grade'],
-            data['Remarks']
-        )
-        return execute_db(query, params)
+    def get_paginated(page=1, per_page=50, cursor=None):
+        """Get one page of results, newest academic year first
 
-    @staticmethod
-    def update(result_id, data):
-        query = '''
-            UPDATE Results_114
-            SET AcademicYear = ?, Term = ?, Subject = ?, Score = ?, Grade = ?, Remarks = ?
-            WHERE ResultID = ?
+        Pass the previous page's ``next_cursor`` as ``cursor`` to seek straight
+        past it on (AcademicYear, Term, ResultID) instead of skipping rows;
+        without it, ``page`` is used with OFFSET/FETCH. Seeks use
+            CREATE INDEX IX_Results_Year_Term ON Results_114(AcademicYear DESC, Term, ResultID)
+        """
+        position = decode_cursor(cursor, 3) if cursor else None
+        if position:
+            year, term, result_id = position
+            where_clause = 'WHERE AcademicYear < ? OR (AcademicYear = ? AND (Term > ? OR (Term = ? AND ResultID > ?)))'
+            params = [year, year, term, term, result_id, 0, per_page + 1]
+        else:
+            where_clause = ''
+            params = [(page - 1) * per_page, per_page + 1]
+
+        query = f'''
+            SELECT ResultID, {', '.join(Result.COLUMNS)} FROM Results_114
+            {where_clause}
+            ORDER BY AcademicYear DESC, Term, ResultID
+            OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
         '''
-        params = (
-            data['AcademicYear'],
-            data['Term'],
-            data['Subject'],
-            data['Score'],
-            data['Grade'],
-            data['Remarks'],
-            result_id
-        )
-        return execute_db(query, params)
+        rows = query_db(query, params)
 
-    @staticmethod
-    def delete(result_id):
-        query = "DELETE FROM Results_114 WHERE ResultID = ?"
-        return execute_db(query, (result_id,))
\ No newline at end of file
+        # One extra row was fetched to tell whether another page follows
+        has_next = len(rows) > per_page
+        results = rows[:per_page]
+
+        next_cursor = None
+        if has_next and results:
+            last = results[-1]
+            next_cursor = encode_cursor(last['AcademicYear'], last['Term'], last['ResultID'])
+
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'has_prev': page > 1,
+            'has_next': has_next,
+            'prev_num': page - 1 if page > 1 else None,
+            'next_num': page + 1 if has_next else None,
+            'next_cursor': next_cursor
+        }
+        return {'results': results, 'pagination': pagination}
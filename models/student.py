@@ -1,95 +1,286 @@
-from database import query_db, execute_db
-from werkzeug.security import generate_password_hash, check_password_hash
+from database import query_db, query_db_iter, query_db_sets, execute_db, execute_returning, executemany_db, escape_like
+from utils.security import hash_password, verify_password, verify_dummy_password
+from utils.cache import ttl_cache
+from utils.pagination import encode_cursor, decode_cursor
+from utils.validators import validate_students_batch
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
+from types import MappingProxyType
 import csv
 import io
 import logging
+import os
+import pyodbc
 import re
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Dictionary keys for the fixed SELECT lists used by the list and detail queries
+_STUDENT_LIST_COLS = (
+    'id', 'student_id', 'first_name', 'last_name', 'gender',
+    'date_of_birth', 'class_name', 'guardian_name', 'guardian_phone',
+    'guardian_email', 'address', 'admission_date', 'status',
+    'photo'
+)
+
+_STUDENT_DETAIL_COLS = (
+    'id', 'student_id', 'first_name', 'last_name', 'gender',
+    'date_of_birth', 'class_name', 'guardian_name', 'guardian_phone',
+    'guardian_email', 'address', 'admission_date', 'teacher_id',
+    'medical_info', 'emergency_contact', 'emergency_phone',
+    'photo', 'status', 'created_at', 'updated_at'
+)
+
+# CSV columns read by bulk_import_from_csv
+_IMPORT_FIELDS = (
+    'first_name', 'last_name', 'gender', 'date_of_birth', 'guardian_name',
+    'guardian_phone', 'guardian_email', 'address', 'class_name', 'admission_date',
+    'teacher_id', 'medical_info', 'emergency_contact', 'emergency_phone'
+)
+
+_IMPORT_REQUIRED_FIELDS = ('first_name', 'last_name', 'gender', 'date_of_birth', 'class_name')
+
+# Student columns shared by the list queries (get_all, get_paginated)
+_LIST_SELECT_SQL = '''
+    s.ID, s.StudentID, s.FirstName, s.LastName, s.Gender,
+    s.DateOfBirth, s.Class, s.GuardianName, s.GuardianPhone,
+    s.GuardianEmail, s.Address, s.AdmissionDate, s.Status,
+    s.Photo'''
+
+# Student.update data keys and the columns they write
+_UPDATE_FIELD_MAP = MappingProxyType({
+    'first_name': 'FirstName',
+    'last_name': 'LastName',
+    'gender': 'Gender',
+    'date_of_birth': 'DateOfBirth',
+    'guardian_name': 'GuardianName',
+    'guardian_phone': 'GuardianPhone',
+    'guardian_email': 'GuardianEmail',
+    'address': 'Address',
+    'class_name': 'Class',
+    'teacher_id': 'TeacherID',
+    'medical_info': 'MedicalInfo',
+    'emergency_contact': 'EmergencyContact',
+    'emergency_phone': 'EmergencyPhone',
+    'photo': 'Photo',
+    'status': 'Status'
+})
+
+# get_paginated sort_by values and the columns they order by
+_SORT_COLUMN_MAP = MappingProxyType({
+    'first_name': 's.FirstName',
+    'last_name': 's.LastName',
+    'student_id': 's.StudentID',
+    'class': 's.Class',
+    'admission_date': 's.AdmissionDate'
+})
+
+# Student dict key holding the value of each get_paginated sort column
+_SORT_KEYS = MappingProxyType({
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'student_id': 'student_id',
+    'class': 'class_name',
+    'admission_date': 'admission_date'
+})
+
+# Detail columns plus teacher names, in _STUDENT_DETAIL_COLS order (get_*_bundle)
+_DETAIL_SELECT_SQL = '''
+    s.ID, s.StudentID, s.FirstName, s.LastName, s.Gender,
+    s.DateOfBirth, s.Class, s.GuardianName, s.GuardianPhone,
+    s.GuardianEmail, s.Address, s.AdmissionDate, s.TeacherID,
+    s.MedicalInfo, s.EmergencyContact, s.EmergencyPhone,
+    s.Photo, s.Status, s.CreatedAt, s.UpdatedAt,
+    t.FirstName AS TeacherFirst, t.LastName AS TeacherLast'''
+
+# Statements shared by the single-query lookups and the detail/profile batches
+_ATTENDANCE_SUMMARY_COLUMNS = '''
+        COUNT(*) as total_days,
+        SUM(CASE WHEN a.Status = 'present' THEN 1 ELSE 0 END) as present_days,
+        SUM(CASE WHEN a.Status = 'absent' THEN 1 ELSE 0 END) as absent_days,
+        SUM(CASE WHEN a.Status = 'late' THEN 1 ELSE 0 END) as late_days'''
+
+_ATTENDANCE_SUMMARY_SQL = f'''
+    SELECT {_ATTENDANCE_SUMMARY_COLUMNS}
+    FROM Attendance_114 a
+    WHERE a.StudentID = {{student}}
+    AND a.Date >= ? AND a.Date < ?'''
+
+# Same summary keyed by the students table's ID, joined rather than looked up in a subquery
+_ATTENDANCE_SUMMARY_BY_ID_SQL = f'''
+    SELECT {_ATTENDANCE_SUMMARY_COLUMNS}
+    FROM Attendance_114 a
+    JOIN students s ON s.StudentID = a.StudentID
+    WHERE s.ID = ?
+    AND a.Date >= ? AND a.Date < ?'''
+
+_ACADEMIC_HISTORY_SQL = '''
+    SELECT 
+        r.Term, r.Year, r.Subject, r.Score, r.Grade,
+        r.Position, r.Remarks, r.CreatedAt
+    FROM Results_114 r
+    WHERE r.StudentID = {student}
+    ORDER BY r.Year DESC, r.Term DESC, r.Subject'''
+
+_CURRENT_TERM_RESULTS_SQL = '''
+    SELECT 
+        r.Subject, r.Score, r.Grade, r.Position, r.Remarks
+    FROM Results_114 r
+    WHERE r.StudentID = {student} 
+    AND r.Year = ?
+    AND r.Term = (
+        SELECT MAX(Term) FROM Results_114 
+        WHERE StudentID = {student} AND Year = ?
+    )
+    ORDER BY r.Subject'''
+
+_STUDENT_EXPORT_COLS = (
+    'student_id', 'first_name', 'last_name', 'gender', 'date_of_birth',
+    'class_name', 'guardian_name', 'guardian_phone', 'guardian_email',
+    'address', 'admission_date', 'status'
+)
+
+# argon2-cffi and hashlib's PBKDF2 both release the GIL while hashing, so a
+# thread pool uses every core without forking a threaded server process
+_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='password-hash')
+
 
 class Student:
     """Student model for managing student data and operations"""
 
+    # Below this many passwords, handing them to the hash pool costs more than it saves
+    PARALLEL_HASH_THRESHOLD = 32
+
+    # CSV rows inserted per create_many call during bulk import
+    IMPORT_BATCH_SIZE = 1000
+
+    INSERT_SQL = '''
+        INSERT INTO students (
+            StudentID, FirstName, LastName, Gender, DateOfBirth,
+            GuardianName, GuardianPhone, GuardianEmail, Address,
+            Class, AdmissionDate, TeacherID, MedicalInfo,
+            EmergencyContact, EmergencyPhone, Photo, Password,
+            Status, CreatedAt, UpdatedAt
+        ) {output}
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
     @staticmethod
-    def create(data):
+    def create(data, now=None):
         """Create a new student record"""
         try:
-            # Generate unique student ID
-            student_id = Student._generate_student_id()
+            query = Student.INSERT_SQL.format(output='OUTPUT INSERTED.ID')
 
-            # Generate default password (can be changed later)
-            default_password = generate_password_hash(f"{data['last_name'].lower()}{student_id[-4:]}")
+            # StudentID is UNIQUE (UQ_Students_StudentID), so a clash with an
+            # existing ID fails the insert; take a fresh ID and try once more
+            for attempt in range(2):
+                # Generate unique student ID
+                student_id = Student._generate_student_id()
 
-            query = '''
-                INSERT INTO students (
-                    StudentID, FirstName, LastName, Gender, DateOfBirth,
-                    GuardianName, GuardianPhone, GuardianEmail, Address,
-                    Class, AdmissionDate, TeacherID, MedicalInfo,
-                    EmergencyContact, EmergencyPhone, Photo, Password,
-                    Status, CreatedAt, UpdatedAt
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
+                # Generate default password (can be changed later)
+                default_password = hash_password(Student._default_password(student_id, data))
+                params = Student._insert_params(student_id, data, default_password, now)
 
-            params = (
-                student_id,
-                data['first_name'],
-                data['last_name'],
-                data['gender'],
-                data['date_of_birth'],
-                data['guardian_name'],
-                data['guardian_phone'],
-                data.get('guardian_email', ''),
-                data.get('address', ''),
-                data['class_name'],
-                data.get('admission_date', datetime.now().date()),
-                data.get('teacher_id'),
-                data.get('medical_info', ''),
-                data.get('emergency_contact', ''),
-                data.get('emergency_phone', ''),
-                data.get('photo'),
-                default_password,
-                'active',
-                datetime.now(),
-                datetime.now()
-            )
-
-            result = execute_db(query, params)
+                try:
+                    new_id = execute_returning(query, params)
+                    break
+                except pyodbc.IntegrityError as e:
+                    if attempt or 'UQ_Students_StudentID' not in str(e):
+                        raise
+                    logger.warning(f"Student ID {student_id} already taken, retrying with a new ID")
+
+            Student._load_classes.cache_clear()
             logger.info(f"Student created with ID: {student_id}")
-            return result
+            return new_id
 
         except Exception as e:
             logger.error(f"Error creating student: {str(e)}")
             raise Exception(f"Failed to create student: {str(e)}")
 
+    @staticmethod
+    def create_many(rows, now=None):
+        """Create many student records in one batch; returns their StudentIDs"""
+        now = now or datetime.now()
+
+        # One counter update reserves IDs for the whole batch
+        student_ids = Student._reserve_student_ids(len(rows))
+        password_hashes = Student._hash_passwords([
+            Student._default_password(student_id, data)
+            for student_id, data in zip(student_ids, rows)
+        ])
+        params_list = [
+            Student._insert_params(student_id, data, password_hash, now)
+            for student_id, data, password_hash in zip(student_ids, rows, password_hashes)
+        ]
+
+        # Single transaction, sent as one fast_executemany batch
+        executemany_db(Student.INSERT_SQL.format(output=''), params_list)
+        Student._load_classes.cache_clear()
+        logger.info(f"{len(student_ids)} students created")
+        return student_ids
+
+    @staticmethod
+    def _default_password(student_id, data):
+        """Initial password for a new student: last name plus the ID's last 4 characters"""
+        return f"{data['last_name'].lower()}{student_id[-4:]}"
+
+    @staticmethod
+    def _insert_params(student_id, data, password_hash, now=None):
+        """Parameter tuple for INSERT_SQL; pass ``now`` to share one timestamp across a batch"""
+        now = now or datetime.now()
+        return (
+            student_id,
+            data['first_name'],
+            data['last_name'],
+            data['gender'],
+            data['date_of_birth'],
+            data['guardian_name'],
+            data['guardian_phone'],
+            data.get('guardian_email', ''),
+            data.get('address', ''),
+            data['class_name'],
+            data.get('admission_date', now.date()),
+            data.get('teacher_id'),
+            data.get('medical_info', ''),
+            data.get('emergency_contact', ''),
+            data.get('emergency_phone', ''),
+            data.get('photo'),
+            password_hash,
+            'active',
+            now,
+            now
+        )
+
     @staticmethod
     def get_all():
         """Get all active students"""
         try:
-            query = '''
-                SELECT 
-                    s.ID, s.StudentID, s.FirstName, s.LastName, s.Gender,
-                    s.DateOfBirth, s.Class, s.GuardianName, s.GuardianPhone,
-                    s.GuardianEmail, s.Address, s.AdmissionDate, s.Status,
-                    s.Photo, t.FirstName + ' ' + t.LastName AS TeacherName
+            query = f'''
+                SELECT {_LIST_SELECT_SQL}, t.FirstName AS TeacherFirst, t.LastName AS TeacherLast
                 FROM students s
                 LEFT JOIN Teachers_114 t ON s.TeacherID = t.ID
                 WHERE s.IsActive = 1
                 ORDER BY s.LastName, s.FirstName
             '''
 
-            results = query_db(query)
-            return [Student._row_to_dict(row) for row in results]
+            results = query_db(query, namedtuples=True)
+            return [Student._row_to_list_dict(row, no_teacher=None) for row in results]
 
         except Exception as e:
             logger.error(f"Error getting all students: {str(e)}")
             raise Exception("Failed to retrieve students")
 
     @staticmethod
-    def get_paginated(page=1, per_page=20, search='', class_filter='', gender_filter='', sort_by='last_name', sort_order='asc'):
-        """Get paginated students with filtering and sorting (single, correct version)"""
+    def get_paginated(page=1, per_page=20, search='', class_filter='', gender_filter='', sort_by='last_name',
+                      sort_order='asc', cursor=None, include_total=False):
+        """Get paginated students with filtering and sorting
+
+        Pass the previous page's ``next_cursor`` as ``cursor`` to seek straight to
+        the next page (keyset pagination); without it, ``page`` is used with
+        OFFSET/FETCH. Totals are only computed with ``include_total=True``, and
+        are estimated from table metadata when no filters are applied.
+        """
         try:
             # Build WHERE clause
             where_conditions = ["s.IsActive = 1"]
@@ -111,86 +302,118 @@ class Student:
                 where_conditions.append("s.Gender = ?")
                 params.append(gender_filter)
 
-            where_clause = " AND ".join(where_conditions)
-
             # Validate sort parameters
-            valid_sort_columns = ['first_name', 'last_name', 'student_id', 'class', 'admission_date']
-            if sort_by not in valid_sort_columns:
+            if sort_by not in _SORT_COLUMN_MAP:
                 sort_by = 'last_name'
 
             if sort_order.lower() not in ['asc', 'desc']:
                 sort_order = 'asc'
+            sort_order = sort_order.lower()
+
+            sort_column = _SORT_COLUMN_MAP[sort_by]
+
+            # s.ID breaks ties so every row has a unique position for keyset seeks;
+            # each sort column needs a matching (column, ID) index, e.g.
+            #   CREATE INDEX IX_Students_LastName_ID ON students(LastName, ID)
+            order_clause = f"ORDER BY {sort_column} {sort_order.upper()}, s.ID {sort_order.upper()}"
+
+            # Get total count - no filter touches Teachers_114, so the count
+            # never joins it. Declaring the relationship lets SQL Server drop
+            # the LEFT JOIN itself from queries that don't read teacher columns:
+            #   ALTER TABLE students ADD CONSTRAINT FK_Students_Teacher
+            #       FOREIGN KEY (TeacherID) REFERENCES Teachers_114(TeacherID)
+            total_count = None
+            total_is_estimate = False
+            if include_total and not params:
+                total_count = Student._estimated_count()
+                total_is_estimate = total_count is not None
+
+            if include_total and total_count is None:
+                count_query = f'''
+                    SELECT COUNT(*) 
+                    FROM students s
+                    WHERE {" AND ".join(where_conditions)}
+                '''
+                total_count = query_db(count_query, params, namedtuples=True)[0][0]
+
+            # Seek past the last row of the previous page instead of skipping rows
+            position = decode_cursor(cursor, 2) if cursor else None
+            page_params = list(params)
+            if position:
+                after_value, after_id = position
+                comparison = '>' if sort_order == 'asc' else '<'
+                # SQL Server sorts NULLs first ascending and last descending, and
+                # "col > NULL" never matches, so pages ending on a NULL (no class,
+                # no admission date) seek within the NULLs and then past them
+                if after_value is None:
+                    rest = f" OR {sort_column} IS NOT NULL" if sort_order == 'asc' else ''
+                    where_conditions.append(f"(({sort_column} IS NULL AND s.ID {comparison} ?){rest})")
+                    page_params.append(after_id)
+                else:
+                    rest = f" OR {sort_column} IS NULL" if sort_order == 'desc' else ''
+                    where_conditions.append(
+                        f"({sort_column} {comparison} ? OR ({sort_column} = ? AND s.ID {comparison} ?){rest})"
+                    )
+                    page_params.extend([after_value, after_value, after_id])
+                paging_clause = "OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+                page_params.append(per_page + 1)
+            else:
+                paging_clause = "OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
+                page_params.extend([(page - 1) * per_page, per_page + 1])
 
-            # Map sort_by to actual column names
-            sort_column_map = {
-                'first_name': 's.FirstName',
-                'last_name': 's.LastName',
-                'student_id': 's.StudentID',
-                'class': 's.Class',
-                'admission_date': 's.AdmissionDate'
-            }
-
-            order_clause = f"ORDER BY {sort_column_map[sort_by]} {sort_order.upper()}"
-
-            # Get total count - simplified query without join first
-            count_query = f'''
-                SELECT COUNT(*) 
-                FROM students s
-                WHERE {where_clause}
-            '''
-
-            total_count = query_db(count_query, params)[0][0]
-
-            # Calculate pagination
-            offset = (page - 1) * per_page
-            total_pages = (total_count + per_page - 1) // per_page
+            where_clause = " AND ".join(where_conditions)
 
-            # Try main query with teacher join
+            # Try main query with teacher join; the names are joined in Python so
+            # the join can be a covered seek on
+            #   CREATE INDEX IX_Teachers_TeacherID_Names ON Teachers_114(TeacherID) INCLUDE (FirstName, LastName)
             try:
                 main_query = f'''
-                    SELECT 
-                        s.ID, s.StudentID, s.FirstName, s.LastName, s.Gender,
-                        s.DateOfBirth, s.Class, s.GuardianName, s.GuardianPhone,
-                        s.GuardianEmail, s.Address, s.AdmissionDate, s.Status,
-                        s.Photo, 
-                        ISNULL(t.FirstName + ' ' + t.LastName, 'No Teacher Assigned') AS TeacherName
+                    SELECT {_LIST_SELECT_SQL}, t.FirstName AS TeacherFirst, t.LastName AS TeacherLast
                     FROM students s
                     LEFT JOIN Teachers_114 t ON s.TeacherID = t.TeacherID
                     WHERE {where_clause}
                     {order_clause}
-                    OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+                    {paging_clause}
                 '''
 
-                params_with_pagination = params + [offset, per_page]
-                results = query_db(main_query, params_with_pagination)
+                results = query_db(main_query, page_params, namedtuples=True)
+                no_teacher = 'No Teacher Assigned'
 
             except Exception as join_error:
                 logger.warning(f"Teacher join failed, using fallback query: {str(join_error)}")
                 # Fallback query without teacher join
                 fallback_query = f'''
-                    SELECT 
-                        s.ID, s.StudentID, s.FirstName, s.LastName, s.Gender,
-                        s.DateOfBirth, s.Class, s.GuardianName, s.GuardianPhone,
-                        s.GuardianEmail, s.Address, s.AdmissionDate, s.Status,
-                        s.Photo, 'Teacher Info Unavailable' AS TeacherName
+                    SELECT {_LIST_SELECT_SQL}, NULL AS TeacherFirst, NULL AS TeacherLast
                     FROM students s
                     WHERE {where_clause}
                     {order_clause}
-                    OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+                    {paging_clause}
                 '''
-                results = query_db(fallback_query, params + [offset, per_page])
+                results = query_db(fallback_query, page_params, namedtuples=True)
+                no_teacher = 'Teacher Info Unavailable'
+
+            # One extra row was fetched to tell whether another page follows
+            has_next = len(results) > per_page
+            students = [Student._row_to_list_dict(row, no_teacher) for row in results[:per_page]]
+
+            next_cursor = None
+            if has_next and students:
+                last = students[-1]
+                next_cursor = encode_cursor(last[_SORT_KEYS[sort_by]], last['id'])
 
-            students = [Student._row_to_dict(row) for row in results]
+            total_pages = (total_count + per_page - 1) // per_page if total_count is not None else None
 
             pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': total_count,
+                'total_is_estimate': total_is_estimate,
                 'pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages,
+                'has_prev': page > 1 or bool(position),
+                'has_next': has_next,
                 'prev_num': page - 1 if page > 1 else None,
-                'next_num': page + 1 if page < total_pages else None
+                'next_num': page + 1 if has_next else None,
+                'next_cursor': next_cursor
             }
 
             return {'students': students, 'pagination': pagination}
@@ -199,6 +422,23 @@ class Student:
             logger.error(f"Error getting paginated students: {str(e)}")
             raise Exception("Failed to retrieve paginated students")
 
+    @staticmethod
+    def _estimated_count():
+        """Row count of the students table from partition metadata, or None if unavailable
+
+        Constant time, but includes inactive students and needs VIEW DATABASE STATE.
+        """
+        try:
+            query = '''
+                SELECT SUM(row_count) 
+                FROM sys.dm_db_partition_stats 
+                WHERE object_id = OBJECT_ID('students') AND index_id IN (0, 1)
+            '''
+            return query_db(query, namedtuples=True)[0][0]
+        except Exception as e:
+            logger.warning(f"Estimated student count unavailable, falling back to COUNT(*): {str(e)}")
+            return None
+
     @staticmethod
     def get_by_id(student_id):
         """Get student by internal ID"""
@@ -212,12 +452,13 @@ class Student:
                         s.GuardianEmail, s.Address, s.AdmissionDate, s.TeacherID,
                         s.MedicalInfo, s.EmergencyContact, s.EmergencyPhone,
                         s.Photo, s.Status, s.CreatedAt, s.UpdatedAt,
-                        ISNULL(t.FirstName + ' ' + t.LastName, 'No Teacher Assigned') AS TeacherName
+                        t.FirstName AS TeacherFirst, t.LastName AS TeacherLast
                     FROM students s
                     LEFT JOIN Teachers_114 t ON s.TeacherID = t.TeacherID
                     WHERE s.ID = ?
                 '''
-                result = query_db(query, (student_id,))
+                result = query_db(query, (student_id,), namedtuples=True)
+                no_teacher = 'No Teacher Assigned'
             except Exception as join_error:
                 logger.warning(f"Teacher join failed in get_by_id, using fallback: {str(join_error)}")
                 # Fallback query without teacher join
@@ -228,13 +469,14 @@ class Student:
                         s.GuardianEmail, s.Address, s.AdmissionDate, s.TeacherID,
                         s.MedicalInfo, s.EmergencyContact, s.EmergencyPhone,
                         s.Photo, s.Status, s.CreatedAt, s.UpdatedAt,
-                        'Teacher Info Unavailable' AS TeacherName
+                        NULL AS TeacherFirst, NULL AS TeacherLast
                     FROM students s
                     WHERE s.ID = ?
                 '''
-                result = query_db(query, (student_id,))
+                result = query_db(query, (student_id,), namedtuples=True)
+                no_teacher = 'Teacher Info Unavailable'
 
-            return Student._row_to_dict(result[0]) if result else None
+            return Student._row_to_detail_dict(result[0], no_teacher) if result else None
 
         except Exception as e:
             logger.error(f"Error getting student by ID {student_id}: {str(e)}")
@@ -253,12 +495,13 @@ class Student:
                         s.GuardianEmail, s.Address, s.AdmissionDate, s.TeacherID,
                         s.MedicalInfo, s.EmergencyContact, s.EmergencyPhone,
                         s.Photo, s.Status, s.CreatedAt, s.UpdatedAt,
-                        ISNULL(t.FirstName + ' ' + t.LastName, 'No Teacher Assigned') AS TeacherName
+                        t.FirstName AS TeacherFirst, t.LastName AS TeacherLast
                     FROM students s
                     LEFT JOIN Teachers_114 t ON s.TeacherID = t.TeacherID
                     WHERE s.StudentID = ? AND s.Status = 'active'
                 '''
-                result = query_db(query, (student_id,))
+                result = query_db(query, (student_id,), namedtuples=True)
+                no_teacher = 'No Teacher Assigned'
             except Exception as join_error:
                 logger.warning(f"Teacher join failed in get_by_student_id, using fallback: {str(join_error)}")
                 # Fallback query without teacher join
@@ -269,13 +512,14 @@ class Student:
                         s.GuardianEmail, s.Address, s.AdmissionDate, s.TeacherID,
                         s.MedicalInfo, s.EmergencyContact, s.EmergencyPhone,
                         s.Photo, s.Status, s.CreatedAt, s.UpdatedAt,
-                        'Teacher Info Unavailable' AS TeacherName
+                        NULL AS TeacherFirst, NULL AS TeacherLast
                     FROM students s
                     WHERE s.StudentID = ? AND s.Status = 'active'
                 '''
-                result = query_db(query, (student_id,))
+                result = query_db(query, (student_id,), namedtuples=True)
+                no_teacher = 'Teacher Info Unavailable'
 
-            return Student._row_to_dict(result[0]) if result else None
+            return Student._row_to_detail_dict(result[0], no_teacher) if result else None
 
         except Exception as e:
             logger.error(f"Error getting student by StudentID {student_id}: {str(e)}")
@@ -285,31 +529,10 @@ class Student:
     def update(student_id, data):
         """Update student information"""
         try:
-            update_fields = []
-            params = []
-
-            field_mapping = {
-                'first_name': 'FirstName',
-                'last_name': 'LastName',
-                'gender': 'Gender',
-                'date_of_birth': 'DateOfBirth',
-                'guardian_name': 'GuardianName',
-                'guardian_phone': 'GuardianPhone',
-                'guardian_email': 'GuardianEmail',
-                'address': 'Address',
-                'class_name': 'Class',
-                'teacher_id': 'TeacherID',
-                'medical_info': 'MedicalInfo',
-                'emergency_contact': 'EmergencyContact',
-                'emergency_phone': 'EmergencyPhone',
-                'photo': 'Photo',
-                'status': 'Status'
-            }
-
-            for key, value in data.items():
-                if key in field_mapping and value is not None:
-                    update_fields.append(f"{field_mapping[key]} = ?")
-                    params.append(value)
+            # Columns are always emitted in _UPDATE_FIELD_MAP order, so the same
+            # set of fields always produces the same SQL text
+            update_fields = [f"{column} = ?" for key, column in _UPDATE_FIELD_MAP.items() if data.get(key) is not None]
+            params = [data[key] for key in _UPDATE_FIELD_MAP if data.get(key) is not None]
 
             if not update_fields:
                 return True
@@ -328,6 +551,8 @@ class Student:
             '''
 
             execute_db(query, params)
+            if 'class_name' in data or 'status' in data:
+                Student._load_classes.cache_clear()
             logger.info(f"Student {student_id} updated")
             return True
 
@@ -346,6 +571,7 @@ class Student:
             '''
 
             execute_db(query, (datetime.now(), student_id))
+            Student._load_classes.cache_clear()
             logger.info(f"Student {student_id} soft deleted")
             return True
 
@@ -357,24 +583,29 @@ class Student:
     def authenticate(student_id, password):
         """Authenticate student login"""
         try:
+            # Fetch only what the password check needs; names are read on success
             query = '''
-                SELECT ID, StudentID, FirstName, LastName, Password, Status
+                SELECT ID, Password
                 FROM students 
                 WHERE StudentID = ? AND Status = 'active'
             '''
 
-            result = query_db(query, (student_id,))
-            if result:
-                student = result[0]
-                if check_password_hash(student['Password'], password):
-                    return {
-                        'ID': student['ID'],
-                        'StudentID': student['StudentID'],
-                        'FirstName': student['FirstName'],
-                        'LastName': student['LastName'],
-                        'Email': student_id  # Using student_id as email for consistency
-                    }
-            return None
+            account = query_db(query, (student_id,), fetchone=True, namedtuples=True)
+            if not account:
+                verify_dummy_password(password)
+                return None
+            if not verify_password(account[1], password):
+                return None
+
+            query = "SELECT FirstName, LastName FROM students WHERE ID = ?"
+            names = query_db(query, (account[0],), fetchone=True, namedtuples=True)
+            return {
+                'ID': account[0],
+                'StudentID': student_id,
+                'FirstName': names[0] if names else None,
+                'LastName': names[1] if names else None,
+                'Email': student_id  # Using student_id as email for consistency
+            }
 
         except Exception as e:
             logger.error(f"Error authenticating student {student_id}: {str(e)}")
@@ -386,13 +617,13 @@ class Student:
         try:
             # Verify current password
             query = "SELECT Password FROM students WHERE StudentID = ?"
-            result = query_db(query, (student_id,))
+            result = query_db(query, (student_id,), namedtuples=True)
 
-            if not result or not check_password_hash(result[0][0], current_password):
+            if not result or not verify_password(result[0][0], current_password):
                 return False
 
             # Update password
-            new_hash = generate_password_hash(new_password)
+            new_hash = hash_password(new_password)
             update_query = '''
                 UPDATE students 
                 SET Password = ?, UpdatedAt = ?
@@ -411,26 +642,77 @@ class Student:
     def get_all_classes():
         """Get list of all classes"""
         try:
-            query = '''
-                SELECT DISTINCT Class 
-                FROM students 
-                WHERE Status = 'active' AND Class IS NOT NULL
-                ORDER BY Class
+            return Student._load_classes()
+
+        except Exception as e:
+            logger.error(f"Error getting classes: {str(e)}")
+            return []
+
+    @staticmethod
+    @ttl_cache(ttl=60, maxsize=1)
+    def _load_classes():
+        """Distinct active classes, cached; cleared whenever students are written"""
+        query = '''
+            SELECT DISTINCT Class 
+            FROM students 
+            WHERE Status = 'active' AND Class IS NOT NULL
+            ORDER BY Class
+        '''
+
+        results = query_db(query, namedtuples=True)
+        return [row[0] for row in results]
+
+    @staticmethod
+    def search(query_text, limit=10, contains=False):
+        """Search students by name, ID, or class (prefix match unless contains=True)"""
+        if contains:
+            return Student.search_contains(query_text, limit)
+        return Student.search_prefix(query_text, limit)
+
+    @staticmethod
+    def search_prefix(query_text, limit=10):
+        """Type-ahead search: names or StudentID starting with the text"""
+        try:
+            # Each branch is a range seek on its own index, e.g.
+            #   CREATE INDEX IX_Students_LastName ON students(LastName) INCLUDE (ID, StudentID, FirstName, Class, Photo, Status)
+            # (likewise FirstName and StudentID); UNION removes rows matched twice
+            top_clause = "TOP (?)" if limit else ""
+            query = f'''
+                SELECT {top_clause} ID, StudentID, FirstName, LastName, Class, Photo
+                FROM (
+                    SELECT ID, StudentID, FirstName, LastName, Class, Photo
+                    FROM students WHERE Status = 'active' AND FirstName LIKE ?
+                    UNION
+                    SELECT ID, StudentID, FirstName, LastName, Class, Photo
+                    FROM students WHERE Status = 'active' AND LastName LIKE ?
+                    UNION
+                    SELECT ID, StudentID, FirstName, LastName, Class, Photo
+                    FROM students WHERE Status = 'active' AND StudentID LIKE ?
+                ) matches
+                ORDER BY LastName, FirstName
             '''
 
-            results = query_db(query)
-            return [row[0] for row in results]
+            # Wildcards typed by the user are matched literally so the pattern
+            # stays a pure prefix and every branch remains an index seek
+            search_param = f"{escape_like(query_text)}%"
+            params = [search_param, search_param, search_param]
+            if limit:
+                params.insert(0, limit)
+            results = query_db(query, params, namedtuples=True)
+
+            return [Student._search_row_to_dict(row) for row in results]
 
         except Exception as e:
-            logger.error(f"Error getting classes: {str(e)}")
+            logger.error(f"Error searching students: {str(e)}")
             return []
 
     @staticmethod
-    def search(query_text, limit=10):
-        """Search students by name, ID, or class"""
+    def search_contains(query_text, limit=10):
+        """Substring search by name, ID, or class (scans the table)"""
         try:
-            query = '''
-                SELECT 
+            top_clause = "TOP (?)" if limit else ""
+            query = f'''
+                SELECT {top_clause}
                     ID, StudentID, FirstName, LastName, Class, Photo
                 FROM students
                 WHERE Status = 'active' AND (
@@ -440,104 +722,60 @@ class Student:
                 ORDER BY LastName, FirstName
             '''
 
-            # Add TOP clause for SQL Server instead of LIMIT
-            if limit:
-                query = f'''
-                    SELECT TOP {limit}
-                        ID, StudentID, FirstName, LastName, Class, Photo
-                    FROM students
-                    WHERE Status = 'active' AND (
-                        FirstName LIKE ? OR LastName LIKE ? OR 
-                        StudentID LIKE ? OR Class LIKE ?
-                    )
-                    ORDER BY LastName, FirstName
-                '''
-
             search_param = f"%{query_text}%"
-            results = query_db(query, (search_param, search_param, search_param, search_param))
+            params = [search_param, search_param, search_param, search_param]
+            if limit:
+                params.insert(0, limit)
+            results = query_db(query, params, namedtuples=True)
 
-            return [{
-                'id': row[0],
-                'student_id': row[1],
-                'first_name': row[2],
-                'last_name': row[3],
-                'class_name': row[4],
-                'photo': row[5]
-            } for row in results]
+            return [Student._search_row_to_dict(row) for row in results]
 
         except Exception as e:
             logger.error(f"Error searching students: {str(e)}")
             return []
 
+    @staticmethod
+    def _search_row_to_dict(row):
+        """Convert a search result row to a dictionary"""
+        return {
+            'id': row[0],
+            'student_id': row[1],
+            'first_name': row[2],
+            'last_name': row[3],
+            'class_name': row[4],
+            'photo': row[5]
+        }
+
     @staticmethod
     def get_academic_history(student_id):
-        """Get student's academic history"""
+        """Get student's academic history (by StudentID code)"""
         try:
-            query = '''
-                SELECT 
-                    r.Term, r.Year, r.Subject, r.Score, r.Grade,
-                    r.Position, r.Remarks, r.CreatedAt
-                FROM Results_114 r
-                WHERE r.StudentID = (SELECT StudentID FROM students WHERE ID = ?)
-                ORDER BY r.Year DESC, r.Term DESC, r.Subject
-            '''
-
-            results = query_db(query, (student_id,))
-            return [{
-                'term': row[0],
-                'year': row[1],
-                'subject': row[2],
-                'score': row[3],
-                'grade': row[4],
-                'position': row[5],
-                'remarks': row[6],
-                'date': row[7]
-            } for row in results]
+            return Student._load_academic_history(student_id)
 
         except Exception as e:
             logger.error(f"Error getting academic history for student {student_id}: {str(e)}")
             return []
 
     @staticmethod
-    def get_attendance_summary(student_id):
-        """Get student's attendance summary"""
-        try:
-            query = '''
-                SELECT 
-                    COUNT(*) as total_days,
-                    SUM(CASE WHEN Status = 'present' THEN 1 ELSE 0 END) as present_days,
-                    SUM(CASE WHEN Status = 'absent' THEN 1 ELSE 0 END) as absent_days,
-                    SUM(CASE WHEN Status = 'late' THEN 1 ELSE 0 END) as late_days
-                FROM Attendance_114
-                WHERE StudentID = (SELECT StudentID FROM students WHERE ID = ?)
-                AND YEAR(Date) = YEAR(GETDATE())
-            '''
-
-            result = query_db(query, (student_id,))
-            if result:
-                row = result[0]
-                total = row[0] or 0
-                present = row[1] or 0
-                absent = row[2] or 0
-                late = row[3] or 0
-
-                attendance_rate = (present / total * 100) if total > 0 else 0
+    @ttl_cache(ttl=300, maxsize=1024)
+    def _load_academic_history(student_id):
+        """Academic history, cached per student; cleared whenever results are written"""
+        query = _ACADEMIC_HISTORY_SQL.format(student='?')
+        results = query_db(query, (student_id,), namedtuples=True)
+        return [Student._history_row_to_dict(row) for row in results]
 
-                return {
-                    'total_days': total,
-                    'present_days': present,
-                    'absent_days': absent,
-                    'late_days': late,
-                    'attendance_rate': round(attendance_rate, 2)
-                }
+    @staticmethod
+    def clear_results_cache():
+        """Drop cached academic histories after Results_114 changes"""
+        Student._load_academic_history.cache_clear()
 
-            return {
-                'total_days': 0,
-                'present_days': 0,
-                'absent_days': 0,
-                'late_days': 0,
-                'attendance_rate': 0
-            }
+    @staticmethod
+    def get_attendance_summary(student_id):
+        """Get student's attendance summary for the current year (by StudentID code)"""
+        try:
+            query = _ATTENDANCE_SUMMARY_SQL.format(student='?')
+            result = query_db(query, (student_id,) + Student._current_year_bounds(), namedtuples=True)
+            return Student._attendance_row_to_dict(result[0] if result else None)
 
         except Exception as e:
             logger.error(f"Error getting attendance summary for student {student_id}: {str(e)}")
@@ -547,59 +785,175 @@ class Student:
     def get_current_term_results(student_id):
         """Get current term results for student"""
         try:
-            query = '''
-                SELECT 
-                    r.Subject, r.Score, r.Grade, r.Position, r.Remarks
-                FROM Results_114 r
-                WHERE r.StudentID = ? 
-                AND r.Year = YEAR(GETDATE())
-                AND r.Term = (
-                    SELECT MAX(Term) FROM Results_114 
-                    WHERE StudentID = ? AND Year = YEAR(GETDATE())
-                )
-                ORDER BY r.Subject
-            '''
-
-            results = query_db(query, (student_id, student_id))
-            return [{
-                'subject': row[0],
-                'score': row[1],
-                'grade': row[2],
-                'position': row[3],
-                'remarks': row[4]
-            } for row in results]
+            query = _CURRENT_TERM_RESULTS_SQL.format(student='?')
+            year = date.today().year
+            results = query_db(query, (student_id, year, student_id, year), namedtuples=True)
+            return [Student._term_result_row_to_dict(row) for row in results]
 
         except Exception as e:
             logger.error(f"Error getting current term results for student {student_id}: {str(e)}")
             return []
 
     @staticmethod
-    def get_upcoming_events(student_id):
-        """Get upcoming events for student"""
+    def get_detail_bundle(student_id):
+        """Get (student, academic_history, attendance_summary) for the detail page
+
+        The student and attendance summary come back in one round trip; the
+        academic history comes from its per-student cache.
+        Returns (None, [], {}) when the student does not exist.
+        """
+        query = f'''
+            SELECT {_DETAIL_SELECT_SQL}
+            FROM students s
+            LEFT JOIN Teachers_114 t ON s.TeacherID = t.TeacherID
+            WHERE s.ID = ?;
+            {_ATTENDANCE_SUMMARY_BY_ID_SQL};
+        '''
         try:
-            query = '''
-                SELECT TOP 5
-                    e.Title, e.Description, e.Date, e.Location, e.Type
-                FROM Events e
-                WHERE e.Date >= GETDATE()
-                AND (e.TargetAudience = 'all' OR e.TargetAudience = 'students'
-                     OR e.TargetClass = (SELECT Class FROM students WHERE ID = ?))
-                ORDER BY e.Date
-            '''
+            params = (student_id, student_id) + Student._current_year_bounds()
+            student_rows, attendance_rows = query_db_sets(query, params)
+        except Exception as e:
+            # Fall back to the individual lookups, which degrade one part at a time
+            logger.warning(f"Detail batch failed for student {student_id}, using separate queries: {str(e)}")
+            student = Student.get_by_id(student_id)
+            if not student:
+                return None, [], {}
+            return (student,
+                    Student.get_academic_history(student['student_id']),
+                    Student.get_attendance_summary(student['student_id']))
+
+        if not student_rows:
+            return None, [], {}
+        student = Student._row_to_detail_dict(student_rows[0])
+        return (student,
+                Student.get_academic_history(student['student_id']),
+                Student._attendance_row_to_dict(attendance_rows[0] if attendance_rows else None))
+
+    @staticmethod
+    def get_profile_bundle(student_id):
+        """Get (student, current_term_results, attendance_summary) for a student's own profile in one round trip
+
+        Looks the student up by StudentID (login ID); returns (None, [], {}) when
+        there is no active student with that ID.
+        """
+        query = f'''
+            SELECT {_DETAIL_SELECT_SQL}
+            FROM students s
+            LEFT JOIN Teachers_114 t ON s.TeacherID = t.TeacherID
+            WHERE s.StudentID = ? AND s.Status = 'active';
+            {_CURRENT_TERM_RESULTS_SQL.format(student='?')};
+            {_ATTENDANCE_SUMMARY_SQL.format(student='?')};
+        '''
+        year = date.today().year
+        try:
+            params = (student_id, student_id, year, student_id, year, student_id) + Student._current_year_bounds()
+            student_rows, result_rows, attendance_rows = query_db_sets(query, params)
+        except Exception as e:
+            logger.warning(f"Profile batch failed for student {student_id}, using separate queries: {str(e)}")
+            student = Student.get_by_student_id(student_id)
+            if not student:
+                return None, [], {}
+            return (student,
+                    Student.get_current_term_results(student_id),
+                    Student.get_attendance_summary(student_id))
+
+        if not student_rows:
+            return None, [], {}
+        return (Student._row_to_detail_dict(student_rows[0]),
+                [Student._term_result_row_to_dict(row) for row in result_rows],
+                Student._attendance_row_to_dict(attendance_rows[0] if attendance_rows else None))
+
+    @staticmethod
+    def _current_year_bounds():
+        """Start of this year and of the next, as a range the attendance index can seek on
+
+        CREATE INDEX IX_Attendance_StudentID_Date ON Attendance_114(StudentID, Date) INCLUDE (Status)
+        """
+        year = date.today().year
+        return date(year, 1, 1), date(year + 1, 1, 1)
+
+    @staticmethod
+    def _attendance_row_to_dict(row):
+        """Convert an attendance summary row (or None) to the summary dictionary"""
+        total = (row[0] if row else 0) or 0
+        present = (row[1] if row else 0) or 0
+        absent = (row[2] if row else 0) or 0
+        late = (row[3] if row else 0) or 0
+
+        attendance_rate = (present / total * 100) if total > 0 else 0
 
-            results = query_db(query, (student_id,))
-            return [{
-                'title': row[0],
-                'description': row[1],
-                'date': row[2],
-                'location': row[3],
-                'type': row[4]
-            } for row in results]
+        return {
+            'total_days': total,
+            'present_days': present,
+            'absent_days': absent,
+            'late_days': late,
+            'attendance_rate': round(attendance_rate, 2)
+        }
+
+    @staticmethod
+    def _history_row_to_dict(row):
+        """Convert an academic history row to a dictionary"""
+        return {
+            'term': row[0],
+            'year': row[1],
+            'subject': row[2],
+            'score': row[3],
+            'grade': row[4],
+            'position': row[5],
+            'remarks': row[6],
+            'date': row[7]
+        }
+
+    @staticmethod
+    def _term_result_row_to_dict(row):
+        """Convert a current term result row to a dictionary"""
+        return {
+            'subject': row[0],
+            'score': row[1],
+            'grade': row[2],
+            'position': row[3],
+            'remarks': row[4]
+        }
+
+    @staticmethod
+    def get_upcoming_events(class_name):
+        """Get upcoming events for students in a class"""
+        try:
+            return Student._load_upcoming_events(class_name)
 
         except Exception as e:
-            logger.error(f"Error getting upcoming events for student {student_id}: {str(e)}")
+            logger.error(f"Error getting upcoming events for class {class_name}: {str(e)}")
             return []
 
+    @staticmethod
+    @ttl_cache(ttl=60)
+    def _load_upcoming_events(class_name):
+        """Next events for a class, cached per class for a minute"""
+        query = '''
+            SELECT TOP 5
+                e.Title, e.Description, e.Date, e.Location, e.Type
+            FROM Events e
+            WHERE e.Date >= GETDATE()
+            AND (e.TargetAudience = 'all' OR e.TargetAudience = 'students'
+                 OR e.TargetClass = ?)
+            ORDER BY e.Date
+        '''
+
+        results = query_db(query, (class_name,), namedtuples=True)
+        return [{
+            'title': row[0],
+            'description': row[1],
+            'date': row[2],
+            'location': row[3],
+            'type': row[4]
+        } for row in results]
+
+    @staticmethod
+    def get_photo(student_id):
+        """Get just the photo filename for a student (None if no student or no photo)"""
+        result = query_db("SELECT Photo FROM students WHERE ID = ?", (student_id,), namedtuples=True)
+        return result[0][0] if result else None
+
     @staticmethod
     def update_status(student_id, status):
         """Update student status"""
@@ -611,6 +965,7 @@ class Student:
             '''
 
             execute_db(query, (status, datetime.now(), student_id))
+            Student._load_classes.cache_clear()
             logger.info(f"Student {student_id} status updated to {status}")
             return True
 
@@ -619,72 +974,85 @@ class Student:
             return False
 
     @staticmethod
-    def get_for_export(class_filter='', gender_filter='', status_filter='active'):
-        """Get students for export"""
-        try:
-            where_conditions = []
-            params = []
-
-            if status_filter:
-                where_conditions.append("Status = ?")
-                params.append(status_filter)
-
-            if class_filter:
-                where_conditions.append("Class = ?")
-                params.append(class_filter)
-
-            if gender_filter:
-                where_conditions.append("Gender = ?")
-                params.append(gender_filter)
-
-            where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
+    def iter_for_export(class_filter='', gender_filter='', status_filter='active'):
+        """Yield students for export one at a time, streaming from the database"""
+        where_conditions = []
+        params = []
+
+        if status_filter:
+            where_conditions.append("Status = ?")
+            params.append(status_filter)
+
+        if class_filter:
+            where_conditions.append("Class = ?")
+            params.append(class_filter)
+
+        if gender_filter:
+            where_conditions.append("Gender = ?")
+            params.append(gender_filter)
+
+        where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
+
+        query = f'''
+            SELECT 
+                StudentID, FirstName, LastName, Gender, DateOfBirth, Class,
+                GuardianName, GuardianPhone, GuardianEmail, Address, AdmissionDate, Status
+            FROM students
+            WHERE {where_clause}
+            ORDER BY LastName, FirstName
+        '''
 
-            query = f'''
-                SELECT 
-                    ID, StudentID, FirstName, LastName, Gender, DateOfBirth, Class,
-                    GuardianName, GuardianPhone, GuardianEmail, Address, AdmissionDate, Status
-                FROM students
-                WHERE {where_clause}
-                ORDER BY LastName, FirstName
-            '''
-
-            results = query_db(query, params)
-            return [{
-                'student_id': row[1],
-                'first_name': row[2],
-                'last_name': row[3],
-                'gender': row[4],
-                'date_of_birth': row[5],
-                'class_name': row[6],
-                'guardian_name': row[7],
-                'guardian_phone': row[8],
-                'guardian_email': row[9],
-                'address': row[10],
-                'admission_date': row[11],
-                'status': row[12]
-            } for row in results]
+        try:
+            for row in query_db_iter(query, params):
+                yield dict(zip(_STUDENT_EXPORT_COLS, row.values()))
 
         except Exception as e:
             logger.error(f"Error getting students for export: {str(e)}")
-            return []
+            raise
 
     @staticmethod
     def bulk_import_from_csv(file):
-        """Bulk import students from CSV file"""
+        """Bulk import students from CSV file
+
+        Rows are validated with validate_students_batch and inserted
+        IMPORT_BATCH_SIZE at a time, each batch as one executemany round trip
+        in its own transaction.
+        """
+        stream = None
         try:
-            # Read CSV content
-            stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-            reader = csv.DictReader(stream)
+            # Decode the upload as it is read instead of copying it into memory;
+            # TextIOWrapper decodes in C, a chunk at a time
+            stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+            reader = csv.reader(stream)
+
+            # Column position of each import field (None if the file lacks it)
+            header = [name.strip() for name in next(reader, [])]
+            positions = {name: index for index, name in enumerate(header)}
+            field_positions = [(field, positions.get(field)) for field in _IMPORT_FIELDS]
+            required_positions = [(field, positions.get(field)) for field in _IMPORT_REQUIRED_FIELDS]
 
             imported = 0
             errors = 0
             error_details = []
+            pending = []
+
+            # One timestamp for the whole file, so an import can be found as a batch
+            now = datetime.now()
+            today = now.date()
 
             for row_num, row in enumerate(reader, start=2):  # Start at 2 for header
+                if not row:
+                    continue  # Blank line
+
                 try:
+                    values = [value.strip() for value in row]
+                    width = len(values)
+
                     # Validate required fields
-                    required_fields = ['first_name', 'last_name', 'gender', 'date_of_birth', 'class_name']
-                    missing_fields = [field for field in required_fields if not row.get(field, '').strip()]
+                    missing_fields = [
+                        field for field, index in required_positions
+                        if index is None or index >= width or not values[index]
+                    ]
 
                     if missing_fields:
                         error_details.append({
@@ -696,25 +1064,16 @@ class Student:
 
                     # Prepare student data
                     student_data = {
-                        'first_name': row['first_name'].strip(),
-                        'last_name': row['last_name'].strip(),
-                        'gender': row['gender'].strip(),
-                        'date_of_birth': row['date_of_birth'].strip(),
-                        'guardian_name': row.get('guardian_name', '').strip(),
-                        'guardian_phone': row.get('guardian_phone', '').strip(),
-                        'guardian_email': row.get('guardian_email', '').strip(),
-                        'address': row.get('address', '').strip(),
-                        'class_name': row['class_name'].strip(),
-                        'admission_date': row.get('admission_date', datetime.now().date()),
-                        'teacher_id': row.get('teacher_id') or None,
-                        'medical_info': row.get('medical_info', '').strip(),
-                        'emergency_contact': row.get('emergency_contact', '').strip(),
-                        'emergency_phone': row.get('emergency_phone', '').strip()
+                        field: values[index] if index is not None and index < width else ''
+                        for field, index in field_positions
                     }
+                    student_data['admission_date'] = student_data['admission_date'] or today
+                    student_data['teacher_id'] = student_data['teacher_id'] or None
 
-                    # Create student
-                    Student.create(student_data)
-                    imported += 1
+                    pending.append((row_num, student_data))
+                    if len(pending) >= Student.IMPORT_BATCH_SIZE:
+                        imported, errors = Student._import_batch(pending, now, imported, errors, error_details)
+                        pending = []
 
                 except Exception as e:
                     error_details.append({
@@ -723,6 +1082,9 @@ class Student:
                     })
                     errors += 1
 
+            if pending:
+                imported, errors = Student._import_batch(pending, now, imported, errors, error_details)
+
             return {
                 'success': True,
                 'imported': imported,
@@ -738,76 +1100,109 @@ class Student:
                 'errors': 0,
                 'error_details': []
             }
+        finally:
+            if stream is not None:
+                # Hand the upload back open; closing the wrapper would close it too
+                stream.detach()
+
+    @staticmethod
+    def _import_batch(pending, now, imported, errors, error_details):
+        """Validate and insert a batch of CSV rows; returns the updated (imported, errors)"""
+        # Checked a column at a time, so values repeated down the file are checked once
+        row_errors = validate_students_batch([student_data for _, student_data in pending])
+        valid = []
+        for (row_num, student_data), messages in zip(pending, row_errors):
+            if messages:
+                error_details.append({
+                    'row': row_num,
+                    'message': '; '.join(messages)
+                })
+                errors += 1
+            else:
+                valid.append((row_num, student_data))
+        pending = valid
+        if not pending:
+            return imported, errors
+
+        try:
+            imported += len(Student.create_many([student_data for _, student_data in pending], now))
+        except Exception as batch_error:
+            # Retry row by row so one bad row doesn't lose the rest of the batch
+            logger.warning(f"Batch insert failed, retrying rows individually: {str(batch_error)}")
+            for row_num, student_data in pending:
+                try:
+                    Student.create(student_data, now)
+                    imported += 1
+                except Exception as e:
+                    error_details.append({
+                        'row': row_num,
+                        'message': str(e)
+                    })
+                    errors += 1
+        return imported, errors
 
     @staticmethod
     def _generate_student_id():
         """Generate unique student ID"""
         try:
-            # Get current year
-            year = datetime.now().year
-            year_suffix = str(year)[-2:]  # Last 2 digits of year
-
-            # Get count of students for this year
-            query = '''
-                SELECT COUNT(*) FROM students 
-                WHERE StudentID LIKE ?
-            '''
-
-            pattern = f"STU{year_suffix}%"
-            result = query_db(query, (pattern,))
-            count = result[0][0] + 1
-
-            # Generate ID: STU + YY + 4-digit sequence
-            student_id = f"STU{year_suffix}{count:04d}"
-
-            # Ensure uniqueness
-            while Student._student_id_exists(student_id):
-                count += 1
-                student_id = f"STU{year_suffix}{count:04d}"
-
-            return student_id
-
+            return Student._reserve_student_ids(1)[0]
         except Exception as e:
             logger.error(f"Error generating student ID: {str(e)}")
             # Fallback to UUID-based ID
             return f"STU{str(uuid.uuid4())[:8].upper()}"
 
     @staticmethod
-    def _student_id_exists(student_id):
-        """Check if student ID already exists"""
-        try:
-            query = "SELECT COUNT(*) FROM students WHERE StudentID = ?"
-            result = query_db(query, (student_id,))
-            return result[0][0] > 0
-        except:
-            return False
+    def _reserve_student_ids(count):
+        """Reserve a contiguous block of ``count`` student IDs for the current year"""
+        # Get current year
+        year = datetime.now().year
+        year_suffix = str(year)[-2:]  # Last 2 digits of year
+
+        # Advance a per-year counter row in one atomic statement; the year's
+        # row is seeded from existing students the first time it is used.
+        # Requires:
+        #   CREATE TABLE StudentIdCounters (YearSuffix CHAR(2) PRIMARY KEY, NextVal INT NOT NULL)
+        #   ALTER TABLE students ADD CONSTRAINT UQ_Students_StudentID UNIQUE (StudentID)
+        query = '''
+            SET NOCOUNT ON;
+            IF NOT EXISTS (SELECT 1 FROM StudentIdCounters WITH (UPDLOCK, HOLDLOCK) WHERE YearSuffix = ?)
+                INSERT INTO StudentIdCounters (YearSuffix, NextVal)
+                SELECT ?, COUNT(*) FROM students WHERE StudentID LIKE ?;
+            UPDATE StudentIdCounters SET NextVal = NextVal + ?
+            OUTPUT INSERTED.NextVal
+            WHERE YearSuffix = ?
+        '''
+
+        pattern = f"STU{year_suffix}%"
+        last = execute_returning(query, (year_suffix, year_suffix, pattern, count, year_suffix))
+
+        # Generate IDs: STU + YY + 4-digit sequence
+        return [f"STU{year_suffix}{number:04d}" for number in range(last - count + 1, last + 1)]
 
     @staticmethod
-    def _row_to_dict(row):
-        """Convert database row to dictionary"""
-        if not row:
-            return None
+    def _hash_passwords(passwords):
+        """Hash a list of passwords, spreading large batches across CPU cores"""
+        if len(passwords) < Student.PARALLEL_HASH_THRESHOLD:
+            return [hash_password(password) for password in passwords]
+        return list(_HASH_POOL.map(hash_password, passwords))
 
-        return {
-            'id': row[0],
-            'student_id': row[1],
-            'first_name': row[2],
-            'last_name': row[3],
-            'gender': row[4],
-            'date_of_birth': row[5],
-            'class_name': row[6],
-            'guardian_name': row[7],
-            'guardian_phone': row[8],
-            'guardian_email': row[9] if len(row) > 9 else '',
-            'address': row[10] if len(row) > 10 else '',
-            'admission_date': row[11] if len(row) > 11 else '',
-            'teacher_id': row[12] if len(row) > 12 else None,
-            'medical_info': row[13] if len(row) > 13 else '',
-            'emergency_contact': row[14] if len(row) > 14 else '',
-            'emergency_phone': row[15] if len(row) > 15 else '',
-            'photo': row[16] if len(row) > 16 else None,
-            'status': row[17] if len(row) > 17 else 'active',
-            'created_at': row[18] if len(row) > 18 else None,
-            'updated_at': row[19] if len(row) > 19 else None,
-            'teacher_name': row[20] if len(row) > 20 else None
-        }
\ No newline at end of file
+    @staticmethod
+    def _row_to_list_dict(row, no_teacher='No Teacher Assigned'):
+        """Convert a list query row (get_all, get_paginated) to a dictionary"""
+        student = dict(zip(_STUDENT_LIST_COLS, row))
+        student['teacher_name'] = Student._teacher_name(row[-2], row[-1], no_teacher)
+        return student
+
+    @staticmethod
+    def _row_to_detail_dict(row, no_teacher='No Teacher Assigned'):
+        """Convert a detail query row (get_by_id, get_by_student_id) to a dictionary"""
+        student = dict(zip(_STUDENT_DETAIL_COLS, row))
+        student['teacher_name'] = Student._teacher_name(row[-2], row[-1], no_teacher)
+        return student
+
+    @staticmethod
+    def _teacher_name(first_name, last_name, default):
+        """Join the teacher's names, or return default when either is missing"""
+        if first_name is None or last_name is None:
+            return default
+        return f"{first_name} {last_name}"
@@ -1,47 +1,115 @@
 # models/teacher.py - Teacher model
-from database import query_db, execute_db
-from werkzeug.security import check_password_hash
+import hmac
+from types import MappingProxyType
+
+from database import query_db, execute_db, escape_like
+from utils.cache import ttl_cache
+from utils.security import hash_password, verify_password, verify_dummy_password
 
 
 class Teacher:
+    # Students are counted per TeacherID alone, which CREATE INDEX
+    # IX_Students_TeacherID ON Students_114(TeacherID) answers from the index.
+    # Built once so every call sends identical text and reuses the cached plan.
+    LIST_SELECT_SQL = '''
+        SELECT t.LastName, t.FirstName, t.Subjects_taught, t.Email,
+               t.PhoneNumber, t.TeacherID, ISNULL(sc.StudentCount, 0) as StudentCount
+        FROM Teachers_114 t
+        LEFT JOIN (
+            SELECT TeacherID, COUNT(*) AS StudentCount
+            FROM Students_114
+            GROUP BY TeacherID
+        ) sc ON sc.TeacherID = t.TeacherID
+    '''
+    LIST_SQL = LIST_SELECT_SQL + 'ORDER BY t.LastName, t.FirstName'
+
+    # Sort keys accepted by search(); anything else falls back to last name
+    ORDER_COLUMNS = MappingProxyType({
+        'first_name': 't.FirstName, t.LastName',
+        'last_name': 't.LastName, t.FirstName',
+    })
+
     @staticmethod
     def get_all():
+        return query_db(Teacher.LIST_SQL)
+
+    @staticmethod
+    @ttl_cache(ttl=60, maxsize=64)
+    def search(subject=None, order_by='last_name'):
+        """Teachers whose Subjects_taught contains subject (all if empty), sorted in the database
+
+        Cached for a minute per (subject, order_by).
+        """
+        order_clause = Teacher.ORDER_COLUMNS.get(order_by, Teacher.ORDER_COLUMNS['last_name'])
+        if not subject:
+            return query_db(f"{Teacher.LIST_SELECT_SQL} ORDER BY {order_clause}")
+
+        # A substring match cannot seek an index; Teachers_114 is small enough
+        # that scanning it server-side beats shipping every row to Python
+        query = f"{Teacher.LIST_SELECT_SQL} WHERE t.Subjects_taught LIKE ? ORDER BY {order_clause}"
+        return query_db(query, (f"%{escape_like(subject)}%",))
+
+    @staticmethod
+    @ttl_cache(ttl=120, maxsize=1)
+    def get_all_active():
+        """Teachers for the class-teacher dropdowns on the student forms, cached for two minutes"""
         query = '''
-            SELECT t.LastName, t.FirstName, t.Subjects_taught, t.Email, 
-                   t.PhoneNumber, t.TeacherID, COUNT(s.StudentID) as StudentCount
-            FROM Teachers_114 t
-            LEFT JOIN Students_114 s ON t.TeacherID = s.TeacherID
-            GROUP BY t.TeacherID, t.FirstName, t.LastName, t.Subjects_taught, t.Email, t.PhoneNumber
-            ORDER BY t.LastName, t.FirstName
+            SELECT TeacherID AS id, FirstName AS first_name, LastName AS last_name,
+                   Subjects_taught AS subject
+            FROM Teachers_114
+            ORDER BY LastName, FirstName
         '''
         return query_db(query)
 
     @staticmethod
+    def clear_cache():
+        """Drop the cached lists and profiles after teachers are added, changed or removed"""
+        Teacher.get_all_active.cache_clear()
+        Teacher.search.cache_clear()
+        Teacher.get_by_id.cache_clear()
+
+    @staticmethod
+    @ttl_cache(ttl=300, maxsize=256)
     def get_by_id(teacher_id):
-        query = "SELECT * FROM Teachers_114 WHERE TeacherID = ?"
+        query = '''
+            SELECT TeacherID, FirstName, LastName, Email, PhoneNumber, Subjects_taught, photo
+            FROM Teachers_114 WHERE TeacherID = ?
+        '''
         results = query_db(query, (teacher_id,))
         return results[0] if results else None
 
     @staticmethod
     def authenticate(email, password):
         """Authenticate teacher login with proper password hashing"""
+        # Index-only with: CREATE INDEX IX_Teachers_Email ON Teachers_114(Email)
+        #                      INCLUDE (TeacherID, FirstName, LastName, password)
         query = '''
             SELECT TeacherID, Email, FirstName, LastName, password
             FROM Teachers_114
             WHERE Email = ?
         '''
         results = query_db(query, (email,))
-        if results:
-            teacher = results[0]
-            # Check if password is hashed (starts with hash methods) or plain text
-            stored_password = teacher['password']
-            if stored_password.startswith(('pbkdf2:', 'scrypt:', 'argon2:')):
-                # Password is hashed, use proper verification
-                if check_password_hash(stored_password, password):
-                    return teacher
-            else:
-                # Password is in plain text (legacy), do direct comparison
-                # This should be updated to use hashed passwords in production
-                if stored_password == password:
-                    return teacher
+        if not results:
+            verify_dummy_password(password)
+            return None
+
+        teacher = results[0]
+        if Teacher.check_password(teacher['TeacherID'], teacher['password'], password):
+            return teacher
         return None
+
+    @staticmethod
+    def check_password(teacher_id, stored_password, password):
+        """Check a password against a teacher's stored (hashed or legacy plain text) password"""
+        # Check if password is hashed (starts with hash methods) or plain text
+        if stored_password.startswith(('pbkdf2:', 'scrypt:', '$argon2')):
+            # Password is hashed, use proper verification
+            return verify_password(stored_password, password)
+
+        # Password is in plain text (legacy): compare in constant time and
+        # replace it with a hash so the next login takes the branch above
+        if hmac.compare_digest(stored_password.encode('utf-8'), password.encode('utf-8')):
+            execute_db("UPDATE Teachers_114 SET password = ? WHERE TeacherID = ?",
+                       (hash_password(password), teacher_id))
+            return True
+        return False
@@ -0,0 +1,47 @@
+# models/user.py - Login lookups across the admin, teacher and student tables
+from database import query_db
+from models.admin import Admin
+from models.teacher import Teacher
+from utils.security import verify_password, verify_dummy_password
+
+
+class User:
+    # Admins win over teachers, teachers over students, when an email is in several tables.
+    # Students log in with their StudentID, which is what the Email column holds for them.
+    LOOKUP_QUERY = '''
+        SELECT 'admin' AS Role, AdminID AS UserID, NULL AS StudentID, Email, Password, 1 AS Priority
+        FROM Admins_114 WHERE Email = ? AND IsActive = 1
+        UNION ALL
+        SELECT 'teacher', TeacherID, NULL, Email, password, 2
+        FROM Teachers_114 WHERE Email = ?
+        UNION ALL
+        SELECT 'student', ID, StudentID, StudentID, Password, 3
+        FROM students WHERE StudentID = ? AND Status = 'active'
+        ORDER BY Priority
+    '''
+
+    @staticmethod
+    def lookup_by_email(email):
+        """Get the login rows (Role, UserID, StudentID, Email, Password) for an email, in priority order"""
+        return query_db(User.LOOKUP_QUERY, (email, email, email))
+
+    @staticmethod
+    def authenticate(email, password):
+        """Authenticate any user with one lookup; returns the matching login row or None"""
+        users = User.lookup_by_email(email)
+        if not users:
+            verify_dummy_password(password)
+            return None
+
+        # Normally a single row; an email shared between tables is tried in priority order
+        for user in users:
+            if user['Role'] == 'teacher':
+                matched = Teacher.check_password(user['UserID'], user['Password'], password)
+            else:
+                matched = verify_password(user['Password'], password)
+
+            if matched:
+                if user['Role'] == 'admin':
+                    Admin.update_last_login(user['UserID'])
+                return user
+        return None
@@ -1,9 +1,11 @@
 # app.py or __init__.py
 from flask import Flask, session
+from config import Config
 
 def create_app():
     app = Flask(__name__)
-    app.secret_key = 'w7T@6zFv$2KmP9!xJ4eBhR^cQ1Lu&nDs'
+    # SECRET_KEY comes from the environment via Config, like app.create_app
+    app.config.from_object(Config)
 
     # Register blueprints, database init, etc.
 
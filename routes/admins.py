@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from models.admin import Admin
-from utils.decorators import login_required, admin_required
+from utils.decorators import login_required, admin_required, conditional_get
 from utils.validators import validate_admin_data
 import logging
 
@@ -13,14 +13,13 @@ def register_admin():
         data = request.form.to_dict()
         errors = validate_admin_data(data)
         if errors:
-            for error in errors:
-                flash(error, 'danger')
-            return redirect(request.url)
+            flash('; '.join(errors), 'danger')
+            return render_template('admins/register.html', form=data)
         try:
             existing_admin = Admin.get_by_email(data['Email'])
             if existing_admin:
                 flash("An account with this email already exists.", "warning")
-                return redirect(request.url)
+                return render_template('admins/register.html', form=data)
 
             Admin.create(data)
             flash("Admin registered successfully. You can now log in.", "success")
@@ -35,12 +34,13 @@ def register_admin():
         except Exception:
             logging.exception("Error during registration")
             flash("Failed to register admin", "danger")
-    return render_template('admins/register.html')
+    return render_template('admins/register.html', form=request.form)
 
 
 @admin_bp.route('/')
 @login_required
 @admin_required
+@conditional_get
 def list_admins():
     try:
         admins = Admin.get_all()
@@ -54,6 +54,7 @@ def list_admins():
 @admin_bp.route('/<int:admin_id>')
 @login_required
 @admin_required
+@conditional_get
 def view_admin(admin_id):
     admin = Admin.get_by_id(admin_id)
     if not admin:
@@ -70,21 +71,20 @@ def create_admin():
         data = request.form.to_dict()
         errors = validate_admin_data(data)
         if errors:
-            for error in errors:
-                flash(error, 'danger')
-            return redirect(request.url)
+            flash('; '.join(errors), 'danger')
+            return render_template('admins/create.html', form=data)
         try:
             existing = Admin.get_by_email(data['Email'])
             if existing:
                 flash("Email already exists.", "warning")
-                return redirect(request.url)
+                return render_template('admins/create.html', form=data)
             Admin.create(data)
             flash("Admin created successfully", "success")
             return redirect(url_for('admins.list_admins'))
         except Exception:
             logging.exception("Error creating admin")
             flash("Failed to create admin", "danger")
-    return render_template('admins/create.html')
+    return render_template('admins/create.html', form=request.form)
 
 
 @admin_bp.route('/<int:admin_id>/edit', methods=['GET', 'POST'])
@@ -99,9 +99,9 @@ def edit_admin(admin_id):
         data = request.form.to_dict()
         errors = validate_admin_data(data)
         if errors:
-            for error in errors:
-                flash(error, 'danger')
-            return redirect(request.url)
+            flash('; '.join(errors), 'danger')
+            # Re-show the submitted values over the admin already loaded above
+            return render_template('admins/edit.html', admin={**admin, **data})
         try:
             Admin.update(admin_id, data)
             flash("Admin updated successfully", "success")
@@ -1,18 +1,22 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from werkzeug.security import check_password_hash
 from models.admin import Admin
-from models.teacher import Teacher
 from models.student import Student
+from models.user import User
 from utils.validators import validate_email
 import logging
+import time
 
 auth_bp = Blueprint('auth', __name__)
 logger = logging.getLogger(__name__)
 
+# Minimum time a forgot-password lookup takes, so known and unknown emails answer alike
+FORGOT_PASSWORD_MIN_SECONDS = 0.2
+
 # Index: redirect to register or login
 @auth_bp.route('/')
 def index():
-    if not Admin.get_all():
+    if not Admin.any_exists():
         return redirect(url_for('auth.register_admin'))
 
     if 'user_role' in session:
@@ -72,31 +76,17 @@ def login():
         email = request.form.get('Email', '').strip().lower()
         password = request.form.get('Password', '')
 
-        user_role = None
-        user_data = None
-
         try:
-            admin_result = Admin.authenticate(email, password)
-            if admin_result:
-                user_role = 'admin'
-                user_data = admin_result
-            else:
-                teacher_result = Teacher.authenticate(email, password)
-                if teacher_result:
-                    user_role = 'teacher'
-                    user_data = teacher_result
-                else:
-                    student_result = Student.authenticate(email, password)
-                    if student_result:
-                        user_role = 'student'
-                        user_data = student_result
-
-            if user_role and user_data:
-                session['user_id'] = user_data['AdminID'] if user_role == 'admin' else \
-                                     user_data['TeacherID'] if user_role == 'teacher' else \
-                                     user_data['StudentID']
+            # One lookup across all user tables and one password hash check
+            # (a dummy one when the email isn't there), so the response time
+            # doesn't reveal whether or where the account exists
+            user = User.authenticate(email, password)
+
+            if user:
+                user_role = user['Role']
+                session['user_id'] = user['StudentID'] if user_role == 'student' else user['UserID']
                 session['user_role'] = user_role
-                session['user_email'] = user_data['Email']
+                session['user_email'] = user['Email']
                 flash(f"Logged in as {user_role.title()}", 'success')
                 return redirect(url_for('auth.dashboard'))
             else:
@@ -157,23 +147,12 @@ def forgot_password():
             flash('Invalid email format.', 'danger')
             return render_template('forgot_password.html')
 
+        started = time.monotonic()
         try:
             # Check if email exists in any of the user tables
-            user_found = False
-            user_type = None
-
-            # Check Admin table
-            if Admin.get_by_email(email):
-                user_found = True
-                user_type = 'admin'
-            # Check Teacher table
-            elif Teacher.get_by_email(email):
-                user_found = True
-                user_type = 'teacher'
-            # Check Student table
-            elif Student.get_by_email(email):
-                user_found = True
-                user_type = 'student'
+            users = User.lookup_by_email(email)
+            user_found = bool(users)
+            user_type = users[0]['Role'] if users else None
 
             if user_found:
                 # In a real application, you would:
@@ -191,6 +170,10 @@ def forgot_password():
         except Exception:
             logger.exception("Forgot password error.")
             flash("An error occurred. Please try again.", "danger")
+        finally:
+            remaining = FORGOT_PASSWORD_MIN_SECONDS - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
 
     return render_template('forgot_password.html')
 
@@ -1,18 +1,37 @@
 # routes/donations.py
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from models.donation import Donation
-from utils.decorators import login_required, admin_required
+from utils.decorators import login_required, admin_required, conditional_get
 
 donations_bp = Blueprint('donations', __name__)
 
+# Form field -> Donations_114 column; the form calls the purpose "Notes"
+FORM_FIELDS = (('DonorName', 'DonorName'), ('Amount', 'Amount'), ('DonationDate', 'DonationDate'), ('Notes', 'Purpose'))
+REQUIRED_COLUMNS = ('DonorName', 'Amount', 'DonationDate')
+
+
+def _donation_form():
+    """Read the donation form in one pass; missing fields come back empty"""
+    return {column: request.form.get(field, '').strip() for field, column in FORM_FIELDS}
+
+
+def _has_required(data):
+    if all(data[column] for column in REQUIRED_COLUMNS):
+        return True
+    flash('Donor name, amount and date are required', 'danger')
+    return False
+
+
 @donations_bp.route('/')
 @login_required
+@conditional_get
 def list_donations():
     donations = Donation.get_all()
     return render_template('donations/list.html', donations=donations)
 
 @donations_bp.route('/<int:donation_id>')
 @login_required
+@conditional_get
 def view_donation(donation_id):
     donation = Donation.get_by_id(donation_id)
     if not donation:
@@ -24,12 +43,9 @@ def view_donation(donation_id):
 @admin_required
 def create_donation():
     if request.method == 'POST':
-        data = {
-            'DonorName': request.form['DonorName'],
-            'Amount': request.form['Amount'],
-            'DonationDate': request.form['DonationDate'],
-            'Purpose': request.form['Notes']
-        }
+        data = _donation_form()
+        if not _has_required(data):
+            return render_template('donations/create.html')
         Donation.create(data)
         flash('Donation recorded successfully', 'success')
         return redirect(url_for('donations.list_donations'))
@@ -43,12 +59,9 @@ def edit_donation(donation_id):
         flash('Donation not found', 'danger')
         return redirect(url_for('donations.list_donations'))
     if request.method == 'POST':
-        data = {
-            'DonorName': request.form['DonorName'],
-            'Amount': request.form['Amount'],
-            'DonationDate': request.form['DonationDate'],
-            'Purpose': request.form['Notes']
-        }
+        data = _donation_form()
+        if not _has_required(data):
+            return render_template('donations/edit.html', donation=donation)
         Donation.update(donation_id, data)
         flash('Donation updated successfully', 'success')
         return redirect(url_for('donations.view_donation', donation_id=donation_id))
@@ -1,7 +1,7 @@
 # routes/event.py - Event routes
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from models.event import Event
-from utils.decorators import login_required, admin_required
+from utils.decorators import login_required, admin_required, conditional_get
 from utils.validators import validate_event_data
 import logging
 
@@ -9,9 +9,10 @@ events_bp = Blueprint('events', __name__)
 
 @events_bp.route('/')
 @login_required
+@conditional_get
 def list_events():
     try:
-        events = Event.get_all()
+        events = Event.iter_all()
         return render_template('events/list.html', events=events)
     except Exception as e:
         logging.exception("Error listing events")
@@ -23,6 +24,7 @@ def list_events():
 
 @events_bp.route('/<int:event_id>')
 @login_required
+@conditional_get
 def view_event(event_id):
     event = Event.get_by_id(event_id)
     if not event:
@@ -40,13 +42,13 @@ def create_event():
 
         if errors:
             flash(f"Validation errors: {errors}", 'danger')
-            return redirect(url_for('events.create_event'))
+            return render_template('events/create.html', form=data)
 
         Event.create(data)
         flash("Event created successfully.", "success")
         return redirect(url_for('events.list_events'))
 
-    return render_template('events/create.html')
+    return render_template('events/create.html', form=request.form)
 
 @events_bp.route('/edit/<int:event_id>', methods=['GET', 'POST'])
 @login_required
@@ -63,7 +65,8 @@ def edit_event(event_id):
 
         if errors:
             flash(f"Validation errors: {errors}", 'danger')
-            return redirect(url_for('events.edit_event', event_id=event_id))
+            # Re-show the submitted values over the event already loaded above
+            return render_template('events/edit.html', event={**event, **data})
 
         Event.update(event_id, data)
         flash("Event updated successfully.", "success")
@@ -1,18 +1,36 @@
 # routes/expenses.py
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from models.expense import Expense
-from utils.decorators import login_required, admin_required
+from utils.decorators import login_required, admin_required, conditional_get
 
 expenses_bp = Blueprint('expenses', __name__)
 
+FORM_FIELDS = ('Title', 'Amount', 'ExpenseDate', 'Category', 'Notes')
+REQUIRED_FIELDS = ('Title', 'Amount', 'ExpenseDate')
+
+
+def _expense_form():
+    """Read the expense form in one pass; missing fields come back empty"""
+    return {field: request.form.get(field, '').strip() for field in FORM_FIELDS}
+
+
+def _has_required(data):
+    if all(data[field] for field in REQUIRED_FIELDS):
+        return True
+    flash('Title, amount and date are required', 'danger')
+    return False
+
+
 @expenses_bp.route('/')
 @login_required
+@conditional_get
 def list_expenses():
     expenses = Expense.get_all()
     return render_template('expenses/list.html', expenses=expenses)
 
 @expenses_bp.route('/<int:expense_id>')
 @login_required
+@conditional_get
 def view_expense(expense_id):
     expense = Expense.get_by_id(expense_id)
     if not expense:
@@ -24,13 +42,9 @@ def view_expense(expense_id):
 @admin_required
 def create_expense():
     if request.method == 'POST':
-        data = {
-            'Title': request.form['Title'],
-            'Amount': request.form['Amount'],
-            'ExpenseDate': request.form['ExpenseDate'],
-            'Category': request.form['Category'],
-            'Notes': request.form['Notes']
-        }
+        data = _expense_form()
+        if not _has_required(data):
+            return render_template('expenses/create.html')
         Expense.create(data)
         flash('Expense recorded successfully', 'success')
         return redirect(url_for('expenses.list_expenses'))
@@ -44,13 +58,9 @@ def edit_expense(expense_id):
         flash('Expense not found', 'danger')
         return redirect(url_for('expenses.list_expenses'))
     if request.method == 'POST':
-        data = {
-            'Title': request.form['Title'],
-            'Amount': request.form['Amount'],
-            'ExpenseDate': request.form['ExpenseDate'],
-            'Category': request.form['Category'],
-            'Notes': request.form['Notes']
-        }
+        data = _expense_form()
+        if not _has_required(data):
+            return render_template('expenses/edit.html', expense=expense)
         Expense.update(expense_id, data)
         flash('Expense updated successfully', 'success')
         return redirect(url_for('expenses.view_expense', expense_id=expense_id))
@@ -1,12 +1,16 @@
 # routes/log.py - Log routes
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, Response, stream_with_context, current_app
 from models.log import Log
 from utils.decorators import login_required, admin_required
+import csv
+import io
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 
 logs_bp = Blueprint('logs', __name__)
 
+EXPORT_CHUNK_SIZE = 64 * 1024  # Characters of CSV sent per streamed chunk, as in the student export
+
 
 @logs_bp.route('/')
 @login_required
@@ -38,16 +42,13 @@ def list_logs():
             logs = Log.get_all(limit)
 
         # Get unique values for filter dropdowns
-        all_logs_sample = Log.get_all(500)  # Sample for filters
-        actions = list(set([log['Action'] for log in all_logs_sample if log['Action']]))
-        users = list(set([log['UserEmail'] for log in all_logs_sample if log['UserEmail']]))
-        tables = list(set([log['TableName'] for log in all_logs_sample if log['TableName']]))
+        facets = Log.get_filter_facets()
 
         return render_template('logs/list.html',
                                logs=logs,
-                               actions=actions,
-                               users=users,
-                               tables=tables,
+                               actions=facets['actions'],
+                               users=facets['users'],
+                               tables=facets['tables'],
                                current_filters={
                                    'action': action_filter,
                                    'user': user_filter,
@@ -103,9 +104,7 @@ def dashboard():
         recent_logs = Log.get_all(20)
 
         # Get logs from last 24 hours
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        today = datetime.now().strftime('%Y-%m-%d')
-        recent_activity = Log.get_by_date_range(yesterday, today, 100)
+        recent_activity = Log.get_recent_activity(100)
 
         return render_template('logs/dashboard.html',
                                activity_summary=activity_summary,
@@ -128,32 +127,61 @@ def export_logs():
         format_type = request.args.get('format', 'json')
         limit = int(request.args.get('limit', 1000))
 
-        logs = Log.get_all(limit)
-
         if format_type == 'csv':
-            import csv
-            import io
-            from flask import make_response
-
-            output = io.StringIO()
-            writer = csv.DictWriter(output,
-                                    fieldnames=['LogID', 'UserEmail', 'Action', 'TableName', 'RecordID', 'Details',
-                                                'Timestamp'])
-            writer.writeheader()
-            for log in logs:
-                writer.writerow(log)
-
-            response = make_response(output.getvalue())
-            response.headers['Content-Type'] = 'text/csv'
-            response.headers[
-                'Content-Disposition'] = f'attachment; filename=logs_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-            return response
+            logs = Log.iter_all(limit)
+
+            def generate():
+                """Stream the CSV as UTF-8 chunks of about EXPORT_CHUNK_SIZE, header first"""
+                output = io.StringIO()
+                writer = csv.DictWriter(output, fieldnames=Log.EXPORT_COLUMNS)
+
+                # Header sent on its own so the download starts immediately
+                writer.writeheader()
+                yield output.getvalue().encode('utf-8')
+                output.seek(0)
+                output.truncate()
+
+                try:
+                    for log in logs:
+                        if output.tell() >= EXPORT_CHUNK_SIZE:
+                            yield output.getvalue().encode('utf-8')
+                            output.seek(0)
+                            output.truncate()
+                        writer.writerow(log)
+                except Exception as e:
+                    # Headers are already sent; re-raising aborts the chunked response
+                    # so the download fails visibly instead of saving a short file
+                    logging.error(f"Error exporting logs: {str(e)}")
+                    raise
+
+                yield output.getvalue().encode('utf-8')
+
+            filename = f"logs_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            return Response(
+                stream_with_context(generate()),
+                mimetype='text/csv',
+                headers={'Content-Disposition': f'attachment; filename={filename}'}
+            )
         else:
-            return jsonify({
-                'logs': logs,
-                'exported_at': datetime.now().isoformat(),
-                'total_count': len(logs)
-            })
+            logs = Log.iter_all(limit)
+            dumps = current_app.json.dumps
+
+            def generate():
+                """Emit the same document jsonify would, one log record at a time"""
+                yield '{"logs": ['
+                count = 0
+                try:
+                    for log in logs:
+                        yield (', ' if count else '') + dumps(log)
+                        count += 1
+                except Exception as e:
+                    # Headers are already sent; re-raise so the chunked response is
+                    # aborted rather than closed as a complete-looking document
+                    logging.error(f"Error exporting logs: {str(e)}")
+                    raise
+                yield f'], "exported_at": {dumps(datetime.now().isoformat())}, "total_count": {count}}}\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/json')
 
     except Exception as e:
         logging.exception("Error exporting logs")
@@ -168,8 +196,8 @@ def cleanup_logs():
     """Delete old logs to maintain database performance"""
     try:
         days = int(request.form.get('days', 90))
-        Log.delete_old_logs(days)
-        flash(f"Successfully cleaned up logs older than {days} days.", "success")
+        Log.delete_old_logs_in_background(days)
+        flash(f"Cleanup of logs older than {days} days has started.", "success")
     except Exception as e:
         logging.exception("Error cleaning up logs")
         flash("Could not clean up logs.", "danger")
@@ -207,6 +235,8 @@ def create_test_log():
         from models.log import log_activity
         user_email = session.get('user_email', 'test@example.com')
         log_activity(user_email, 'TEST', 'TestTable', 123, 'This is a test log entry')
+        Log.flush()  # Write it now so it shows on the list page we redirect to
+        Log.clear_caches()
         flash("Test log created successfully.", "success")
     except Exception as e:
         logging.exception("Error creating test log")
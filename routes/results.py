@@ -9,8 +9,14 @@ results_bp = Blueprint('results', __name__)
 @results_bp.route('/')
 @login_required
 def list_results():
-    results = Result.get_all()
-    return render_template('results/list.html', results=results)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 10), 200)
+    cursor = request.args.get('cursor') or None
+
+    result_data = Result.get_paginated(page=page, per_page=per_page, cursor=cursor)
+    return render_template('results/list.html',
+                           results=result_data['results'],
+                           pagination=result_data['pagination'])
 
 @results_bp.route('/student/<int:student_id>')
 @login_required
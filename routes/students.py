@@ -1,5 +1,5 @@
 # routes/students.py - Enhanced Student Management Routes
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, send_file, Response, stream_with_context, current_app
 from werkzeug.utils import secure_filename
 from models.student import Student
 from models.teacher import Teacher
@@ -10,6 +10,7 @@ import os
 import csv
 import io
 import logging
+import mimetypes
 from datetime import datetime
 
 # Configure logging
@@ -21,6 +22,24 @@ students_bp = Blueprint('students', __name__)
 UPLOAD_FOLDER = 'static/uploads/students'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+API_SEARCH_MAX_LIMIT = 50  # Most rows the type-ahead API returns per keystroke
+EXPORT_CHUNK_SIZE = 64 * 1024  # Characters of CSV sent per streamed chunk
+
+# Student form fields read by new_student (and edit_student, without admission_date, plus status)
+STUDENT_FORM_FIELDS = (
+    'first_name', 'last_name', 'gender', 'date_of_birth', 'guardian_name',
+    'guardian_phone', 'guardian_email', 'address', 'class_name', 'admission_date',
+    'teacher_id', 'medical_info', 'emergency_contact', 'emergency_phone'
+)
+STUDENT_EDIT_FIELDS = tuple(field for field in STUDENT_FORM_FIELDS if field != 'admission_date') + ('status',)
+
+
+def _read_student_form(fields):
+    """Read the student form in one pass; values are stripped and missing ones are empty"""
+    form = request.form
+    data = {field: form.get(field, '').strip() for field in fields}
+    data['teacher_id'] = data['teacher_id'] or None
+    return data
 
 
 @students_bp.route('/')
@@ -41,6 +60,7 @@ def list_students():
         gender_filter = request.args.get('gender', '').strip()
         sort_by = request.args.get('sort', 'last_name')
         sort_order = request.args.get('order', 'asc')
+        cursor = request.args.get('cursor') or None
 
         # Validate pagination parameters
         per_page = min(max(per_page, 5), 100)  # Between 5 and 100
@@ -54,7 +74,9 @@ def list_students():
             class_filter=class_filter,
             gender_filter=gender_filter,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor,
+            include_total=True
         )
 
         # Get available classes for filter dropdown
@@ -93,15 +115,12 @@ def list_students():
 def view_student(student_id):
     """View detailed student information"""
     try:
-        student = Student.get_by_id(student_id)
+        # Student, results and attendance in one round trip
+        student, academic_history, attendance_summary = Student.get_detail_bundle(student_id)
         if not student:
             flash('Student not found', 'warning')
             return redirect(url_for('students.list_students'))
 
-        # Get additional student data
-        academic_history = Student.get_academic_history(student_id)
-        attendance_summary = Student.get_attendance_summary(student_id)
-
         return render_template('students/detail.html',
                                student=student,
                                academic_history=academic_history,
@@ -119,16 +138,14 @@ def profile():
     """Student's own profile page"""
     try:
         student_id = session.get('user_id')
-        student = Student.get_by_student_id(student_id)
+        student, current_results, attendance_summary = Student.get_profile_bundle(student_id)
 
         if not student:
             flash('Student profile not found', 'danger')
             return redirect(url_for('auth.student_login'))
 
-        # Get student's academic information
-        current_results = Student.get_current_term_results(student_id)
-        attendance_summary = Student.get_attendance_summary(student['id'])
-        upcoming_events = Student.get_upcoming_events(student['id'])
+        # Events are cached per class, so usually no query here
+        upcoming_events = Student.get_upcoming_events(student['class_name'])
 
         return render_template('students/profile.html',
                                student=student,
@@ -149,22 +166,7 @@ def new_student():
     if request.method == 'POST':
         try:
             # Get and validate form data
-            student_data = {
-                'first_name': request.form.get('first_name', '').strip(),
-                'last_name': request.form.get('last_name', '').strip(),
-                'gender': request.form.get('gender', ''),
-                'date_of_birth': request.form.get('date_of_birth', ''),
-                'guardian_name': request.form.get('guardian_name', '').strip(),
-                'guardian_phone': request.form.get('guardian_phone', '').strip(),
-                'guardian_email': request.form.get('guardian_email', '').strip(),
-                'address': request.form.get('address', '').strip(),
-                'class_name': request.form.get('class_name', '').strip(),
-                'admission_date': request.form.get('admission_date', ''),
-                'teacher_id': request.form.get('teacher_id') or None,
-                'medical_info': request.form.get('medical_info', '').strip(),
-                'emergency_contact': request.form.get('emergency_contact', '').strip(),
-                'emergency_phone': request.form.get('emergency_phone', '').strip()
-            }
+            student_data = _read_student_form(STUDENT_FORM_FIELDS)
 
             # Validate input data
             validation_errors = validate_student_data(student_data)
@@ -220,22 +222,8 @@ def edit_student(student_id):
 
         if request.method == 'POST':
             # Get and validate form data
-            student_data = {
-                'first_name': request.form.get('first_name', '').strip(),
-                'last_name': request.form.get('last_name', '').strip(),
-                'gender': request.form.get('gender', ''),
-                'date_of_birth': request.form.get('date_of_birth', ''),
-                'guardian_name': request.form.get('guardian_name', '').strip(),
-                'guardian_phone': request.form.get('guardian_phone', '').strip(),
-                'guardian_email': request.form.get('guardian_email', '').strip(),
-                'address': request.form.get('address', '').strip(),
-                'class_name': request.form.get('class_name', '').strip(),
-                'teacher_id': request.form.get('teacher_id') or None,
-                'medical_info': request.form.get('medical_info', '').strip(),
-                'emergency_contact': request.form.get('emergency_contact', '').strip(),
-                'emergency_phone': request.form.get('emergency_phone', '').strip(),
-                'status': request.form.get('status', 'active')
-            }
+            student_data = _read_student_form(STUDENT_EDIT_FIELDS)
+            student_data['status'] = student_data['status'] or 'active'
 
             # Validate input data
             validation_errors = validate_student_data(student_data, is_update=True)
@@ -339,50 +327,58 @@ def bulk_import():
 @admin_required
 def export_students():
     """Export students to CSV"""
-    try:
-        # Get filter parameters
-        class_filter = request.args.get('class', '')
-        gender_filter = request.args.get('gender', '')
-        status_filter = request.args.get('status', 'active')
+    # Get filter parameters
+    class_filter = request.args.get('class', '')
+    gender_filter = request.args.get('gender', '')
+    status_filter = request.args.get('status', 'active')
 
-        students = Student.get_for_export(class_filter, gender_filter, status_filter)
+    students = Student.iter_for_export(class_filter, gender_filter, status_filter)
 
-        # Create CSV in memory
+    def generate():
+        """Stream the CSV as UTF-8 chunks of about EXPORT_CHUNK_SIZE, header first"""
         output = io.StringIO()
         writer = csv.writer(output)
 
-        # Write header
+        # Write header; sent on its own so the download starts immediately
         writer.writerow([
             'Student ID', 'First Name', 'Last Name', 'Gender', 'Date of Birth',
             'Class', 'Guardian Name', 'Guardian Phone', 'Guardian Email',
             'Address', 'Admission Date', 'Status'
         ])
-
-        # Write data
-        for student in students:
-            writer.writerow([
-                student['student_id'], student['first_name'], student['last_name'],
-                student['gender'], student['date_of_birth'], student['class_name'],
-                student['guardian_name'], student['guardian_phone'],
-                student['guardian_email'], student['address'],
-                student['admission_date'], student['status']
-            ])
-
-        # Create response
+        yield output.getvalue().encode('utf-8')
         output.seek(0)
-        filename = f"students_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        output.truncate()
 
-        return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
-        )
+        # Write data; one reused buffer, flushed in chunks rather than per row
+        try:
+            for student in students:
+                if output.tell() >= EXPORT_CHUNK_SIZE:
+                    yield output.getvalue().encode('utf-8')
+                    output.seek(0)
+                    output.truncate()
+                writer.writerow([
+                    student['student_id'], student['first_name'], student['last_name'],
+                    student['gender'], student['date_of_birth'], student['class_name'],
+                    student['guardian_name'], student['guardian_phone'],
+                    student['guardian_email'], student['address'],
+                    student['admission_date'], student['status']
+                ])
+        except Exception as e:
+            # Headers are already sent; re-raising aborts the chunked response
+            # so the download fails visibly instead of saving a short file
+            logger.error(f"Error exporting students: {str(e)}")
+            raise
 
-    except Exception as e:
-        logger.error(f"Error exporting students: {str(e)}")
-        flash('Error exporting students', 'danger')
-        return redirect(url_for('students.list_students'))
+        yield output.getvalue().encode('utf-8')
+
+    # Create response
+    filename = f"students_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 
 @students_bp.route('/api/search')
@@ -391,12 +387,12 @@ def api_search():
     """API endpoint for student search (AJAX)"""
     try:
         query = request.args.get('q', '').strip()
-        limit = request.args.get('limit', 10, type=int)
+        limit = min(max(request.args.get('limit', 10, type=int), 1), API_SEARCH_MAX_LIMIT)
 
         if len(query) < 2:
             return jsonify({'students': []})
 
-        students = Student.search(query, limit)
+        students = Student.search_prefix(query, limit)
 
         return jsonify({
             'students': [{
@@ -413,19 +409,40 @@ def api_search():
         return jsonify({'error': 'Search failed'}), 500
 
 
+def student_photo_url(photo):
+    """Static URL of a stored photo filename, or of the default avatar"""
+    if photo:
+        return url_for('static', filename=f"uploads/students/{photo}")
+    return url_for('static', filename='images/default_avatar.png')
+
+
+@students_bp.app_context_processor
+def inject_student_photo_url():
+    # Pages that already have the student row link its photo directly, so a
+    # list page costs no extra request (or query) per avatar
+    return dict(student_photo_url=student_photo_url)
+
+
 @students_bp.route('/<int:student_id>/photo')
 @login_required
 def student_photo(student_id):
-    """Serve student photo"""
+    """Serve student photo by ID, for callers that only have the ID"""
     try:
-        student = Student.get_by_id(student_id)
-        if not student or not student.get('photo'):
+        photo = Student.get_photo(student_id)
+        if not photo:
             # Return default avatar
             return redirect(url_for('static', filename='images/default_avatar.png'))
 
-        photo_path = os.path.join(UPLOAD_FOLDER, student['photo'])
+        accel_prefix = current_app.config.get('PHOTO_ACCEL_PREFIX')
+        if accel_prefix:
+            # nginx sends the file itself (and its own 404 page for missing files)
+            response = Response(mimetype=mimetypes.guess_type(photo)[0] or 'application/octet-stream')
+            response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{secure_filename(photo)}"
+            return response
+
+        photo_path = os.path.join(UPLOAD_FOLDER, photo)
         if os.path.exists(photo_path):
-            return send_file(photo_path)
+            return send_file(photo_path, max_age=86400)
         else:
             return redirect(url_for('static', filename='images/default_avatar.png'))
 
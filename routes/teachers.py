@@ -1,18 +1,32 @@
 import os
-import uuid
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_from_directory
+import secrets
+import mimetypes
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_from_directory, Response, current_app
 from werkzeug.utils import secure_filename
 from models.teacher import Teacher
 from utils.decorators import login_required, admin_required, teacher_required
 from utils.validators import validate_teacher_data
+from utils.file_handler import allowed_file, save_upload
 import logging
 
 teachers_bp = Blueprint('teachers', __name__)
 UPLOAD_FOLDER = 'static/photos/teachers'
+PHOTO_MAX_AGE = 365 * 24 * 3600  # Uploaded photos get a fresh random name, so never change
+DEFAULT_PHOTO = 'default.jpg'
 
 # Ensure upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+
+def _save_photo(photo):
+    """Save an uploaded photo under a random name and return that name"""
+    # The name is hex plus an extension allowed_file() already accepted,
+    # so there is nothing left for secure_filename to clean
+    ext = os.path.splitext(photo.filename)[1].lower()
+    filename = f"{secrets.token_hex(16)}{ext}"
+    save_upload(photo, os.path.join(UPLOAD_FOLDER, filename))
+    return filename
+
 @teachers_bp.route('/')
 @login_required
 @admin_required
@@ -21,17 +35,8 @@ def list_teachers():
         subject = request.args.get('subject', '').strip()
         sort = request.args.get('sort', 'last_name')
 
-        teachers = Teacher.get_all()
-
-        # Filter
-        if subject:
-            teachers = [t for t in teachers if subject.lower() in t['Subjects_taught'].lower()]
-
-        # Sort
-        if sort == 'first_name':
-            teachers.sort(key=lambda x: x['FirstName'])
-        else:
-            teachers.sort(key=lambda x: x['LastName'])
+        # Filtered and sorted by the database (case-insensitive under the default collation)
+        teachers = Teacher.search(subject, sort)
 
         return render_template('teachers/list.html', teachers=teachers, subject=subject, sort=sort)
     except Exception as e:
@@ -57,19 +62,18 @@ def create_teacher():
         data = request.form.to_dict()
         errors = validate_teacher_data(data)
         photo = request.files.get('photo')
+        if photo and not allowed_file(photo.filename):
+            errors.append("Photo must be a PNG, JPG, GIF or WEBP image")
 
         if errors:
             flash(f"Validation errors: {errors}", 'danger')
             return redirect(url_for('teachers.create_teacher'))
 
-        filename = None
         if photo:
-            ext = os.path.splitext(photo.filename)[1]
-            filename = f"{uuid.uuid4().hex}{ext}"
-            photo.save(os.path.join(UPLOAD_FOLDER, secure_filename(filename)))
-            data['photo'] = filename
+            data['photo'] = _save_photo(photo)
 
         Teacher.create(data)
+        Teacher.clear_cache()
         flash('Teacher created successfully.', 'success')
         return redirect(url_for('teachers.list_teachers'))
 
@@ -88,18 +92,18 @@ def edit_teacher(teacher_id):
         data = request.form.to_dict()
         errors = validate_teacher_data(data)
         photo = request.files.get('photo')
+        if photo and not allowed_file(photo.filename):
+            errors.append("Photo must be a PNG, JPG, GIF or WEBP image")
 
         if errors:
             flash(f"Validation errors: {errors}", 'danger')
             return redirect(url_for('teachers.edit_teacher', teacher_id=teacher_id))
 
         if photo:
-            ext = os.path.splitext(photo.filename)[1]
-            filename = f"{uuid.uuid4().hex}{ext}"
-            photo.save(os.path.join(UPLOAD_FOLDER, secure_filename(filename)))
-            data['photo'] = filename
+            data['photo'] = _save_photo(photo)
 
         Teacher.update(teacher_id, data)
+        Teacher.clear_cache()
         flash('Teacher updated successfully.', 'success')
         return redirect(url_for('teachers.view_teacher', teacher_id=teacher_id))
 
@@ -114,12 +118,27 @@ def delete_teacher(teacher_id):
         flash('Teacher not found.', 'warning')
     else:
         Teacher.delete(teacher_id)
+        Teacher.clear_cache()
         flash('Teacher deleted successfully.', 'info')
     return redirect(url_for('teachers.list_teachers'))
 
 @teachers_bp.route('/photo/<filename>')
 def serve_teacher_photo(filename):
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    accel_prefix = current_app.config.get('TEACHER_PHOTO_ACCEL_PREFIX')
+    if accel_prefix:
+        # nginx sends the file with sendfile(2); Python never reads the bytes
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{secure_filename(filename)}"
+    else:
+        response = send_from_directory(UPLOAD_FOLDER, filename)
+
+    # A replaced photo is saved under a new name, so browsers can keep this
+    # one for good; the shared placeholder may still be swapped out
+    if filename != DEFAULT_PHOTO:
+        response.cache_control.public = True
+        response.cache_control.max_age = PHOTO_MAX_AGE
+        response.cache_control.immutable = True
+    return response
 
 @teachers_bp.route('/login', methods=['GET', 'POST'])
 def teacher_login():
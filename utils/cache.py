@@ -0,0 +1,51 @@
+# utils/cache.py - In-process caches for small, slowly-changing query results
+import functools
+import threading
+import time
+
+# Separates positional from keyword arguments in cache keys, as functools.lru_cache does
+_KWARGS_MARK = object()
+
+
+def ttl_cache(ttl, maxsize=128):
+    """Cache a function's results per argument tuple for ``ttl`` seconds
+
+    Keyword arguments are part of the key, so f(1) and f(x=1) are cached
+    separately (as with functools.lru_cache) but both work.
+
+    The wrapped function gains ``cache_clear()`` so writers can drop stale
+    entries immediately. Each worker process keeps its own copy.
+    """
+    def decorator(func):
+        entries = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+                if entry and entry[0] > now:
+                    return entry[1]
+
+            # Run the query outside the lock; concurrent misses may both load
+            value = func(*args, **kwargs)
+
+            with lock:
+                if len(entries) >= maxsize:
+                    expired = [key for key, (expires, _) in entries.items() if expires <= now]
+                    for key in expired or list(entries)[:1]:
+                        del entries[key]
+                entries[key] = (now + ttl, value)
+
+            return value
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
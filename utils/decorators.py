@@ -1,6 +1,25 @@
-# utils/decorators.py - Authentication decorators
+# utils/decorators.py - Authentication and response decorators
+import hashlib
 from functools import wraps
-from flask import session, flash, redirect, url_for
+from flask import session, flash, redirect, url_for, request, make_response, g
+
+def _current_role():
+    """The logged-in user's role (None if logged out), read from the session once per request"""
+    if '_user_role' not in g:
+        g._user_role = session.get('user_role')
+    return g._user_role
+
+def role_required(*roles, message):
+    """Allow only users whose role is one of roles; others go to the dashboard with message"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if _current_role() not in roles:
+                flash(message, 'danger')
+                return redirect(url_for('main.dashboard'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
 
 def login_required(f):
     @wraps(f)
@@ -11,42 +30,38 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user_role' not in session or session['user_role'] != 'admin':
-            flash('Admin access required', 'danger')
-            return redirect(url_for('main.dashboard'))
-        return f(*args, **kwargs)
-    return decorated_function
+admin_required = role_required('admin', message='Admin access required')
+teacher_required = role_required('teacher', message='Teacher access required')
+student_required = role_required('student', message='Student access required')
+_admin_or_teacher = role_required('admin', 'teacher', message='Admin or teacher access required.')
 
-def teacher_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user_role' not in session or session['user_role'] != 'teacher':
-            flash('Teacher access required', 'danger')
-            return redirect(url_for('main.dashboard'))
-        return f(*args, **kwargs)
-    return decorated_function
+def admin_or_teacher_required(f):
+    checked = _admin_or_teacher(f)
 
-def student_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_role' not in session or session['user_role'] != 'student':
-            flash('Student access required', 'danger')
-            return redirect(url_for('main.dashboard'))
-        return f(*args, **kwargs)
+        if _current_role() is None:
+            flash('Login required', 'danger')
+            return redirect(url_for('auth.login'))
+        return checked(*args, **kwargs)
     return decorated_function
 
-def admin_or_teacher_required(f):
+def conditional_get(f):
+    """Tag rendered GET pages with an ETag and answer a matching If-None-Match with 304
+
+    Pages carry the user's name and flashed messages, so the tag is a hash of
+    the rendered body and the response stays private. Browsers revalidate on
+    every visit (no-cache) so a redirect after a write never shows a stale list.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_role' not in session:
-            flash('Login required', 'danger')
-            return redirect(url_for('auth.login'))
-        
-        if session['user_role'] not in ('admin', 'teacher'):
-            flash("Admin or teacher access required.", "danger")
-            return redirect(url_for('main.dashboard'))
-        return f(*args, **kwargs)
+        response = make_response(f(*args, **kwargs))
+        if request.method != 'GET' or response.status_code != 200 or response.direct_passthrough:
+            return response
+
+        response.set_etag(hashlib.blake2b(response.get_data(), digest_size=16).hexdigest())
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        return response.make_conditional(request)
     return decorated_function
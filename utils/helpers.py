@@ -1,20 +1,17 @@
+import functools
+from bisect import bisect_right
+
+# Lower bound of each grade above F, ascending; _GRADES[i] is the grade for
+# scores with i cutoffs at or below them
+_GRADE_CUTOFFS = (40, 50, 60, 70, 80, 90)
+_GRADES = ('F', 'D', 'C', 'B', 'B+', 'A', 'A+')
+
+
 def get_grade(score):
     """Calculate grade based on score"""
-    if score >= 90:
-        return 'A+'
-    elif score >= 80:
-        return 'A'
-    elif score >= 70:
-        return 'B+'
-    elif score >= 60:
-        return 'B'
-    elif score >= 50:
-        return 'C'
-    elif score >= 40:
-        return 'D'
-    else:
-        return 'F'
+    return _GRADES[bisect_right(_GRADE_CUTOFFS, score)]
 
+@functools.lru_cache(maxsize=4096)
 def format_currency(amount):
-    """Format currency for display"""
-    return f"GH₵ {amount:,.2f}"
\ No newline at end of file
+    """Format currency for display (cached; statements repeat the same fee amounts)"""
+    return f"GH₵ {amount:,.2f}"
@@ -0,0 +1,35 @@
+# utils/pagination.py - Opaque cursor tokens for keyset pagination
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _cursor_default(value):
+    """JSON-encode the sort values json can't: dates as ISO strings, anything else via str"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(*values):
+    """Encode a keyset pagination position (sort values then row ID) as a URL-safe token"""
+    payload = json.dumps(values, default=_cursor_default).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor, size):
+    """Decode a token from encode_cursor into a tuple of ``size`` values
+
+    The last value is the row ID and is returned as an int. Returns None if
+    the token is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("wrong number of cursor values")
+        return (*values[:-1], int(values[-1]))
+    except (ValueError, TypeError):
+        logger.warning(f"Ignoring invalid pagination cursor: {cursor}")
+        return None
@@ -0,0 +1,89 @@
+# utils/security.py - Password hashing and verification helpers
+import hashlib
+import hmac
+import secrets
+import threading
+from collections import OrderedDict
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # argon2-cffi not installed; keep werkzeug's hashes
+    PasswordHasher = None
+
+# New hashes use argon2id when argon2-cffi is available; existing werkzeug
+# hashes keep verifying, so stored passwords migrate as they are changed
+_argon2 = PasswordHasher(time_cost=2, memory_cost=19 * 1024, parallelism=1) if PasswordHasher else None
+
+# Recent successful verifications keyed by (stored hash, HMAC of the password).
+# Failures are never cached: a fast repeated wrong guess would reveal that the
+# account exists, since unknown accounts always pay for verify_dummy_password.
+# The HMAC key is random per process, so cached digests are useless elsewhere,
+# and a password change produces a new hash, which invalidates old entries.
+_CACHE_KEY = secrets.token_bytes(32)
+_CACHE_SIZE = 1024
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
+# Hash checked when a login names no account, built on first use
+_dummy_hash = None
+
+
+def hash_password(password):
+    """Hash a password for storage"""
+    if _argon2:
+        return _argon2.hash(password)
+
+    from werkzeug.security import generate_password_hash
+    return generate_password_hash(password)
+
+
+def _check_hash(password_hash, password):
+    """Run the (expensive) check for whichever scheme produced the hash"""
+    if password_hash.startswith('$argon2'):
+        if not _argon2:
+            return False
+        try:
+            return _argon2.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    from werkzeug.security import check_password_hash
+    return check_password_hash(password_hash, password)
+
+
+def verify_password(password_hash, password):
+    """Check a password against its stored hash, caching successful checks"""
+    if not password_hash or password is None:
+        return False
+
+    digest = hmac.new(_CACHE_KEY, password.encode('utf-8'), hashlib.sha256).digest()
+    key = (password_hash, digest)
+
+    with _verified_lock:
+        if key in _verified:
+            _verified.move_to_end(key)
+            return True
+
+    # The expensive key-derivation runs outside the lock
+    if not _check_hash(password_hash, password):
+        return False
+
+    with _verified_lock:
+        _verified[key] = True
+        if len(_verified) > _CACHE_SIZE:
+            _verified.popitem(last=False)
+
+    return True
+
+
+def verify_dummy_password(password):
+    """Spend a real hash check's time on a login for an unknown account
+
+    Keeps response times from revealing which usernames exist. Always False.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_urlsafe(16))
+    _check_hash(_dummy_hash, password or '')
+    return False
@@ -0,0 +1,54 @@
+# utils/serialization.py - JSON encoding for API responses
+import decimal
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # orjson not installed; Flask's stdlib-json provider is used
+    orjson = None
+
+
+def _default(obj):
+    """Encode the types orjson leaves to us the way Flask's default provider does"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, 'timetuple'):  # date and datetime, as HTTP dates like jsonify
+        return http_date(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() backed by orjson, producing the same output as the default provider"""
+
+    def _options(self):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Callers asking for stdlib-specific options get the stdlib encoder
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self._options())
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def register_json_provider(app):
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
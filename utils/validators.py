@@ -1,37 +1,113 @@
 # utils/validators.py - Comprehensive Input Validation
+import functools
 import re
+import string
 from datetime import datetime, date
-from dateutil import parser
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _required_fields(fields):
+    """Pair each required field with its error message, built once at import"""
+    return tuple((field, f"{field.replace('_', ' ').title()} is required") for field in fields)
+
+
+STUDENT_REQUIRED = _required_fields(('first_name', 'last_name', 'gender', 'date_of_birth', 'class_name'))
+TEACHER_REQUIRED = _required_fields(('first_name', 'last_name', 'email', 'phone', 'subject'))
+EVENT_REQUIRED = _required_fields(('title', 'date', 'location'))
+ADMIN_REQUIRED = _required_fields(('first_name', 'last_name', 'email', 'password'))
+DONATION_REQUIRED = _required_fields(('donor_name', 'amount', 'date'))
+EXPENSE_REQUIRED = _required_fields(('description', 'amount', 'date', 'category'))
+
+
+def _is_blank(value):
+    """True for None, '' or whitespace only; isspace() tests without building a stripped copy"""
+    return not value or value.isspace()
+
+
+def missing_required(data, required):
+    """Messages for the required fields that are absent or blank, in field order"""
+    return [message for field, message in required if _is_blank(data.get(field))]
+
+
+# Characters allowed on each side of an email's '@', and in its top-level domain
+EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + '.-')
+EMAIL_TLD_CHARS = frozenset(string.ascii_letters)
+PHONE_CLEAN_PATTERN = re.compile(r'[\s\-\(\)]')
+# Ghana phone patterns, keyed by the first character that tells them apart
+PHONE_PATTERNS = {
+    '0': re.compile(r'^0[2-9]\d{8}$'),  # Local format: 0XXXXXXXXX
+    '+': re.compile(r'^\+233[2-9]\d{8}$'),  # International: +233XXXXXXXXX
+    '2': re.compile(r'^233[2-9]\d{8}$'),  # International without +: 233XXXXXXXXX
+}
+# Format: STU + 2-digit year + 4-digit sequence (e.g., STU240001)
+STUDENT_ID_PATTERN = re.compile(r'^STU\d{6}$')
+# Letters, spaces, hyphens, apostrophes (for names like O'Connor, Mary-Jane)
+NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-'\.]+$")
+# ASCII characters NAME_PATTERN accepts, for a set check that skips the regex engine;
+# names with other (Unicode) whitespace still fall back to the pattern
+NAME_CHARS = frozenset(string.ascii_letters + string.whitespace + "-'.")
+PASSWORD_LETTERS = frozenset(string.ascii_letters)
+HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
+# Null bytes and other control characters (tab, newline and CR are kept), as a str.translate deletion table
+CONTROL_CHAR_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+# Allowed choices, in display order, with sets for the membership checks
+GENDERS = ('male', 'female', 'other')
+GENDER_SET = frozenset(GENDERS)
+INVALID_GENDER = (False, f"Gender must be one of: {', '.join(GENDERS)}")
+EXPENSE_CATEGORIES = (
+    'supplies', 'utilities', 'maintenance', 'salaries', 'transport',
+    'food', 'equipment', 'events', 'other'
+)
+EXPENSE_CATEGORY_SET = frozenset(EXPENSE_CATEGORIES)
+# Common weak passwords
+WEAK_PASSWORDS = frozenset({
+    'password', '12345678', 'qwerty', 'abc123', 'password123',
+    '11111111', '00000000', 'letmein', 'welcome', 'admin'
+})
+
+DANGEROUS_FILENAME_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\.\.', r'[<>:"|?*]', r'^(con|prn|aux|nul|com[1-9]|lpt[1-9])(\.|$)',
+    r'^\s*$', r'^\.'
+))
+
+
+@functools.lru_cache(maxsize=4096)
 def validate_email(email):
-    """Validate email format"""
+    """Validate email format (memoized; the same addresses are resubmitted often)"""
     if not email:
         return False
 
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email.strip()) is not None
+    # Structural check equivalent to ^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$
+    # without running (or backtracking in) the regex engine
+    email = email.strip()
+    at = email.rfind('@')
+    if at < 1:
+        return False
+
+    local, domain = email[:at], email[at + 1:]
+    if not EMAIL_LOCAL_CHARS.issuperset(local) or not EMAIL_DOMAIN_CHARS.issuperset(domain):
+        return False
 
+    dot = domain.rfind('.')
+    tld = domain[dot + 1:]
+    return dot > 0 and len(tld) >= 2 and EMAIL_TLD_CHARS.issuperset(tld)
 
+
+@functools.lru_cache(maxsize=4096)
 def validate_phone(phone):
-    """Validate phone number format (Ghana format)"""
+    """Validate phone number format (Ghana format; memoized like validate_email)"""
     if not phone:
         return False
 
     # Remove spaces, dashes, and parentheses
-    clean_phone = re.sub(r'[\s\-\(\)]', '', phone)
-
-    # Ghana phone patterns
-    patterns = [
-        r'^0[2-9]\d{8}$',  # Local format: 0XXXXXXXXX
-        r'^\+233[2-9]\d{8}$',  # International: +233XXXXXXXXX
-        r'^233[2-9]\d{8}$',  # International without +: 233XXXXXXXXX
-    ]
+    clean_phone = PHONE_CLEAN_PATTERN.sub('', phone)
 
-    return any(re.match(pattern, clean_phone) for pattern in patterns)
+    # Only the one format that can match is tried
+    pattern = PHONE_PATTERNS.get(clean_phone[:1])
+    return pattern is not None and pattern.match(clean_phone) is not None
 
 
 def validate_student_id_format(student_id):
@@ -39,24 +115,65 @@ def validate_student_id_format(student_id):
     if not student_id:
         return False
 
-    # Format: STU + 2-digit year + 4-digit sequence (e.g., STU240001)
-    pattern = r'^STU\d{6}$'
-    return re.match(pattern, student_id.upper()) is not None
+    return STUDENT_ID_PATTERN.match(student_id.upper()) is not None
+
+
+# Tried after ISO dates before falling back to dateutil; month-first like dateutil's default
+DATE_FORMATS = ('%m/%d/%Y', '%Y/%m/%d')
+
+
+@functools.lru_cache(maxsize=1)
+def _dateutil_parser():
+    """Import dateutil's parser on first use; most forms never need it"""
+    from dateutil import parser
+    return parser
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(date_str):
+    """Parse a form date, raising ValueError or TypeError if it is not one
+
+    HTML date inputs send ISO dates, which date.fromisoformat handles in C;
+    dateutil's general parser (imported on first use) is the last resort.
+    Memoized: bulk imports repeat the same admission and birth dates.
+    """
+    text = str(date_str).strip()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            pass
+
+    return _dateutil_parser().parse(text).date()
+
+
+# Field names (as passed by the record validators, or as form keys) that get range checks
+BIRTH_DATE_FIELDS = frozenset({'Date of birth', 'Birth date', 'date_of_birth', 'birth_date'})
+ADMISSION_DATE_FIELDS = frozenset({'Admission date', 'admission_date'})
+
 
+def validate_date(date_str, field_name="Date", today=None):
+    """Validate date format and reasonableness
 
-def validate_date(date_str, field_name="Date"):
-    """Validate date format and reasonableness"""
+    Pass ``today`` when validating many dates at once; it is otherwise read
+    only for the fields that are range-checked against it.
+    """
     if not date_str:
         return False, f"{field_name} is required"
 
     try:
         # Try to parse the date
-        parsed_date = parser.parse(date_str).date()
+        parsed_date = _parse_date(date_str)
 
         # Check if date is reasonable (not in future for birth dates, etc.)
-        today = date.today()
+        if field_name in BIRTH_DATE_FIELDS:
+            today = today or date.today()
 
-        if field_name.lower() in ['date_of_birth', 'birth_date']:
             # Birth date should not be in future or too far in past (150 years)
             if parsed_date > today:
                 return False, "Birth date cannot be in the future"
@@ -65,7 +182,9 @@ def validate_date(date_str, field_name="Date"):
             if parsed_date < min_date:
                 return False, "Birth date is too far in the past"
 
-        elif field_name.lower() in ['admission_date']:
+        elif field_name in ADMISSION_DATE_FIELDS:
+            today = today or date.today()
+
             # Admission date should be reasonable (within school operation period)
             min_date = date(1950, 1, 1)  # Assuming school started after 1950
             max_date = date(today.year + 1, 12, 31)  # Allow future admissions
@@ -81,40 +200,42 @@ def validate_date(date_str, field_name="Date"):
 
 def validate_name(name, field_name="Name", min_length=2, max_length=50):
     """Validate person names"""
-    if not name or not name.strip():
+    if _is_blank(name):
         return False, f"{field_name} is required"
 
     name = name.strip()
+    length = len(name)
 
-    if len(name) < min_length:
+    if length < min_length:
         return False, f"{field_name} must be at least {min_length} characters"
 
-    if len(name) > max_length:
+    if length > max_length:
         return False, f"{field_name} must not exceed {max_length} characters"
 
     # Allow letters, spaces, hyphens, apostrophes (for names like O'Connor, Mary-Jane)
-    if not re.match(r"^[a-zA-Z\s\-'\.]+$", name):
+    if not NAME_CHARS.issuperset(name) and not NAME_PATTERN.match(name):
         return False, f"{field_name} can only contain letters, spaces, hyphens, and apostrophes"
 
     return True, name.title()  # Return title-cased name
 
 
+@functools.lru_cache(maxsize=64)
 def validate_gender(gender):
-    """Validate gender selection"""
-    valid_genders = ['male', 'female', 'other']
-
+    """Validate gender selection (memoized; a handful of values repeat across imports)"""
     if not gender:
         return False, "Gender is required"
 
-    if gender.lower() not in valid_genders:
-        return False, f"Gender must be one of: {', '.join(valid_genders)}"
+    gender = gender.lower()
+    if gender not in GENDER_SET:
+        return INVALID_GENDER
 
-    return True, gender.lower()
+    return True, gender
 
 
+@functools.lru_cache(maxsize=256)
 def validate_class_name(class_name):
-    """Validate class/grade name"""
-    if not class_name or not class_name.strip():
+    """Validate class/grade name (memoized; a school has few distinct classes)"""
+    if _is_blank(class_name):
         return False, "Class is required"
 
     class_name = class_name.strip()
@@ -134,215 +255,216 @@ def validate_password(password, min_length=8):
     if len(password) < min_length:
         return False, f"Password must be at least {min_length} characters long"
 
-    # Check for at least one letter and one number
-    if not re.search(r'[a-zA-Z]', password):
+    # Check for at least one letter and one number, in one pass that stops
+    # as soon as both are seen (isdecimal matches what regex \d does)
+    has_letter = has_digit = False
+    for char in password:
+        if char in PASSWORD_LETTERS:
+            has_letter = True
+        elif char.isdecimal():
+            has_digit = True
+        if has_letter and has_digit:
+            break
+
+    if not has_letter:
         return False, "Password must contain at least one letter"
 
-    if not re.search(r'\d', password):
+    if not has_digit:
         return False, "Password must contain at least one number"
 
     # Check for common weak passwords
-    weak_passwords = [
-        'password', '12345678', 'qwerty', 'abc123', 'password123',
-        '11111111', '00000000', 'letmein', 'welcome', 'admin'
-    ]
-
-    if password.lower() in weak_passwords:
+    if password.lower() in WEAK_PASSWORDS:
         return False, "Password is too common. Please choose a stronger password"
 
     return True, password
 
 
-def validate_student_data(data, is_update=False):
-    """Validate complete student data"""
-    errors = []
-
-    # Validate required fields for new students
-    if not is_update:
-        required_fields = ['first_name', 'last_name', 'gender', 'date_of_birth', 'class_name']
-        for field in required_fields:
-            if not data.get(field, '').strip():
-                errors.append(f"{field.replace('_', ' ').title()} is required")
-
-    # Validate first name
-    if data.get('first_name'):
-        is_valid, result = validate_name(data['first_name'], "First name")
-        if not is_valid:
-            errors.append(result)
-
-    # Validate last name
-    if data.get('last_name'):
-        is_valid, result = validate_name(data['last_name'], "Last name")
-        if not is_valid:
-            errors.append(result)
-
-    # Validate gender
-    if data.get('gender'):
-        is_valid, result = validate_gender(data['gender'])
-        if not is_valid:
-            errors.append(result)
-
-    # Validate date of birth
-    if data.get('date_of_birth'):
-        is_valid, result = validate_date(data['date_of_birth'], "Date of birth")
-        if not is_valid:
-            errors.append(result)
-
-    # Validate guardian name
-    if data.get('guardian_name'):
-        is_valid, result = validate_name(data['guardian_name'], "Guardian name")
-        if not is_valid:
-            errors.append(result)
-
-    # Validate guardian phone
-    if data.get('guardian_phone'):
-        if not validate_phone(data['guardian_phone']):
-            errors.append("Guardian phone number format is invalid")
+def _result_check(validator, *args, **kwargs):
+    """Field check from a validator returning (is_valid, result); result is the error message"""
+    def check(value):
+        is_valid, result = validator(value, *args, **kwargs)
+        return None if is_valid else result
+    return check
+
+
+def _format_check(is_valid, message, optional=False):
+    """Field check from a True/False validator; optional fields may be left blank"""
+    def check(value):
+        if optional and value.isspace():
+            return None
+        return None if is_valid(value) else message
+    return check
+
+
+def _length_check(label, max_length, min_length=0, strip=False):
+    """Field check for text length limits"""
+    def check(value):
+        if strip:
+            value = value.strip()
+        if len(value) < min_length:
+            return f"{label} must be at least {min_length} characters"
+        if len(value) > max_length:
+            return f"{label} is too long (maximum {max_length} characters)"
+        return None
+    return check
+
+
+MAX_AMOUNT = 1000000  # 1 million limit on a single donation or expense
+
+
+def _amount_check(kind):
+    """Field check for a positive money amount of at most MAX_AMOUNT"""
+    invalid = f"Invalid {kind} amount"
+    not_positive = f"{kind.title()} amount must be greater than 0"
+    too_large = f"{kind.title()} amount is too large"
+
+    def check(value):
+        # Numbers (e.g. from JSON or an import) are compared as they are
+        if not isinstance(value, (int, float)):
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                return invalid
+        if value <= 0:
+            return not_positive
+        if value > MAX_AMOUNT:
+            return too_large
+        return None
+    return check
+
+
+def _event_date_check(value):
+    """Event dates must parse and not be in the past"""
+    is_valid, result = validate_date(value, "Event date")
+    if not is_valid:
+        return result
+    # Event date should not be too far in the past
+    if isinstance(result, date) and result < date.today():
+        return "Event date cannot be in the past"
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _category_check(value):
+    if value.lower() not in EXPENSE_CATEGORY_SET:
+        return f"Category must be one of: {', '.join(EXPENSE_CATEGORIES)}"
+    return None
+
+
+def _collect_errors(data, schema, errors):
+    """Run each (field, check) in schema over the fields present in data, appending to errors"""
+    get = data.get
+    append = errors.append
+    for field, check in schema:
+        value = get(field)
+        if value:
+            error = check(value)
+            if error:
+                append(error)
+    return errors
 
-    # Validate guardian email (optional)
-    if data.get('guardian_email') and data['guardian_email'].strip():
-        if not validate_email(data['guardian_email']):
-            errors.append("Guardian email format is invalid")
 
-    # Validate emergency phone (optional)
-    if data.get('emergency_phone') and data['emergency_phone'].strip():
-        if not validate_phone(data['emergency_phone']):
-            errors.append("Emergency phone number format is invalid")
+# Per-record field checks, in the order their errors are reported. Blank
+# fields are skipped here; missing_required reports the required ones.
+STUDENT_CHECKS = (
+    ('first_name', _result_check(validate_name, "First name")),
+    ('last_name', _result_check(validate_name, "Last name")),
+    ('gender', _result_check(validate_gender)),
+    ('date_of_birth', _result_check(validate_date, "Date of birth")),
+    ('guardian_name', _result_check(validate_name, "Guardian name")),
+    ('guardian_phone', _format_check(validate_phone, "Guardian phone number format is invalid")),
+    ('guardian_email', _format_check(validate_email, "Guardian email format is invalid", optional=True)),
+    ('emergency_phone', _format_check(validate_phone, "Emergency phone number format is invalid", optional=True)),
+    ('class_name', _result_check(validate_class_name)),
+    ('admission_date', _result_check(validate_date, "Admission date")),
+    ('address', _length_check("Address", 200)),
+    ('medical_info', _length_check("Medical information", 500)),
+)
+
+TEACHER_CHECKS = (
+    ('first_name', _result_check(validate_name, "First Name")),
+    ('last_name', _result_check(validate_name, "Last Name")),
+    ('email', _format_check(validate_email, "Email format is invalid")),
+    ('phone', _format_check(validate_phone, "Phone number format is invalid")),
+    ('date_of_birth', _result_check(validate_date, "Date of birth")),
+    ('hire_date', _result_check(validate_date, "Hire date")),
+)
+
+EVENT_CHECKS = (
+    ('title', _length_check("Event title", 100, min_length=3, strip=True)),
+    ('date', _event_date_check),
+    ('location', _length_check("Location", 100, min_length=2, strip=True)),
+    ('description', _length_check("Description", 1000)),
+)
+
+ADMIN_CHECKS = (
+    ('first_name', _result_check(validate_name, "First Name")),
+    ('last_name', _result_check(validate_name, "Last Name")),
+    ('email', _format_check(validate_email, "Email format is invalid")),
+)
+
+DONATION_CHECKS = (
+    ('donor_name', _result_check(validate_name, "Donor name", max_length=100)),
+    ('amount', _amount_check('donation')),
+    ('date', _result_check(validate_date, "Donation date")),
+    ('donor_email', _format_check(validate_email, "Donor email format is invalid", optional=True)),
+    ('donor_phone', _format_check(validate_phone, "Donor phone number format is invalid", optional=True)),
+)
+
+EXPENSE_CHECKS = (
+    ('description', _length_check("Description", 200, min_length=3, strip=True)),
+    ('amount', _amount_check('expense')),
+    ('date', _result_check(validate_date, "Expense date")),
+    ('category', _category_check),
+)
 
-    # Validate class name
-    if data.get('class_name'):
-        is_valid, result = validate_class_name(data['class_name'])
-        if not is_valid:
-            errors.append(result)
 
-    # Validate admission date (optional)
-    if data.get('admission_date'):
-        is_valid, result = validate_date(data['admission_date'], "Admission date")
-        if not is_valid:
-            errors.append(result)
+def validate_student_data(data, is_update=False):
+    """Validate complete student data"""
+    errors = [] if is_update else missing_required(data, STUDENT_REQUIRED)
+    _collect_errors(data, STUDENT_CHECKS, errors)
+    return errors
 
-    # Validate address length
-    if data.get('address') and len(data['address']) > 200:
-        errors.append("Address is too long (maximum 200 characters)")
 
-    # Validate medical info length
-    if data.get('medical_info') and len(data['medical_info']) > 500:
-        errors.append("Medical information is too long (maximum 500 characters)")
+def validate_students_batch(rows, is_update=False):
+    """Validate many student dicts at once, e.g. a CSV import; one error list per row
 
-    return errors
+    Same results as validate_student_data on each row, but checks run a column
+    at a time and once per distinct value, so values shared by many rows
+    (class, gender, admission date) are checked once per batch.
+    """
+    results = [[] if is_update else missing_required(row, STUDENT_REQUIRED) for row in rows]
+    for field, check in STUDENT_CHECKS:
+        outcomes = {}
+        for errors, row in zip(results, rows):
+            value = row.get(field)
+            if not value:
+                continue
+            if value not in outcomes:
+                outcomes[value] = check(value)
+            if outcomes[value]:
+                errors.append(outcomes[value])
+    return results
 
 
 def validate_teacher_data(data, is_update=False):
     """Validate teacher data"""
-    errors = []
-
-    # Required fields for new teachers
-    if not is_update:
-        required_fields = ['first_name', 'last_name', 'email', 'phone', 'subject']
-        for field in required_fields:
-            if not data.get(field, '').strip():
-                errors.append(f"{field.replace('_', ' ').title()} is required")
-
-    # Validate names
-    for name_field in ['first_name', 'last_name']:
-        if data.get(name_field):
-            is_valid, result = validate_name(data[name_field], name_field.replace('_', ' ').title())
-            if not is_valid:
-                errors.append(result)
-
-    # Validate email
-    if data.get('email'):
-        if not validate_email(data['email']):
-            errors.append("Email format is invalid")
-
-    # Validate phone
-    if data.get('phone'):
-        if not validate_phone(data['phone']):
-            errors.append("Phone number format is invalid")
-
-    # Validate date of birth (optional for teachers)
-    if data.get('date_of_birth'):
-        is_valid, result = validate_date(data['date_of_birth'], "Date of birth")
-        if not is_valid:
-            errors.append(result)
-
-    # Validate hire date (optional)
-    if data.get('hire_date'):
-        is_valid, result = validate_date(data['hire_date'], "Hire date")
-        if not is_valid:
-            errors.append(result)
-
+    errors = [] if is_update else missing_required(data, TEACHER_REQUIRED)
+    _collect_errors(data, TEACHER_CHECKS, errors)
     return errors
 
 
 def validate_event_data(data, is_update=False):
     """Validate event data"""
-    errors = []
-
-    # Required fields
-    if not is_update:
-        required_fields = ['title', 'date', 'location']
-        for field in required_fields:
-            if not data.get(field, '').strip():
-                errors.append(f"{field.title()} is required")
-
-    # Validate title
-    if data.get('title'):
-        title = data['title'].strip()
-        if len(title) < 3:
-            errors.append("Event title must be at least 3 characters")
-        if len(title) > 100:
-            errors.append("Event title is too long (maximum 100 characters)")
-
-    # Validate date
-    if data.get('date'):
-        is_valid, result = validate_date(data['date'], "Event date")
-        if not is_valid:
-            errors.append(result)
-        else:
-            # Event date should not be too far in the past
-            if isinstance(result, date):
-                today = date.today()
-                if result < today:
-                    errors.append("Event date cannot be in the past")
-
-    # Validate location
-    if data.get('location'):
-        location = data['location'].strip()
-        if len(location) < 2:
-            errors.append("Location must be at least 2 characters")
-        if len(location) > 100:
-            errors.append("Location is too long (maximum 100 characters)")
-
-    # Validate description length
-    if data.get('description') and len(data['description']) > 1000:
-        errors.append("Description is too long (maximum 1000 characters)")
-
+    errors = [] if is_update else missing_required(data, EVENT_REQUIRED)
+    _collect_errors(data, EVENT_CHECKS, errors)
     return errors
 
 
 def validate_admin_data(data, is_update=False):
     """Validate admin input data"""
-    errors = []
-
-    # Required fields
-    if not is_update:
-        required_fields = ['first_name', 'last_name', 'email', 'password']
-        for field in required_fields:
-            if not data.get(field, '').strip():
-                errors.append(f"{field.replace('_', ' ').title()} is required")
-
-    # Validate names
-    for name_field in ['first_name', 'last_name']:
-        if data.get(name_field):
-            is_valid, result = validate_name(data[name_field], name_field.replace('_', ' ').title())
-            if not is_valid:
-                errors.append(result)
-
-    # Validate email
-    if data.get('email'):
-        if not validate_email(data['email']):
-            errors.append("Email format is invalid")
+    errors = [] if is_update else missing_required(data, ADMIN_REQUIRED)
+    _collect_errors(data, ADMIN_CHECKS, errors)
 
     # Validate password (only if creating or updating password)
     if not is_update or data.get('password'):
@@ -355,95 +477,15 @@ def validate_admin_data(data, is_update=False):
 
 def validate_donation_data(data):
     """Validate donation data"""
-    errors = []
-
-    # Required fields
-    required_fields = ['donor_name', 'amount', 'date']
-    for field in required_fields:
-        if not data.get(field, '').strip():
-            errors.append(f"{field.replace('_', ' ').title()} is required")
-
-    # Validate donor name
-    if data.get('donor_name'):
-        is_valid, result = validate_name(data['donor_name'], "Donor name", max_length=100)
-        if not is_valid:
-            errors.append(result)
-
-    # Validate amount
-    if data.get('amount'):
-        try:
-            amount = float(data['amount'])
-            if amount <= 0:
-                errors.append("Donation amount must be greater than 0")
-            if amount > 1000000:  # 1 million limit
-                errors.append("Donation amount is too large")
-        except (ValueError, TypeError):
-            errors.append("Invalid donation amount")
-
-    # Validate date
-    if data.get('date'):
-        is_valid, result = validate_date(data['date'], "Donation date")
-        if not is_valid:
-            errors.append(result)
-
-    # Validate email (optional)
-    if data.get('donor_email') and data['donor_email'].strip():
-        if not validate_email(data['donor_email']):
-            errors.append("Donor email format is invalid")
-
-    # Validate phone (optional)
-    if data.get('donor_phone') and data['donor_phone'].strip():
-        if not validate_phone(data['donor_phone']):
-            errors.append("Donor phone number format is invalid")
-
+    errors = missing_required(data, DONATION_REQUIRED)
+    _collect_errors(data, DONATION_CHECKS, errors)
     return errors
 
 
 def validate_expense_data(data):
     """Validate expense data"""
-    errors = []
-
-    # Required fields
-    required_fields = ['description', 'amount', 'date', 'category']
-    for field in required_fields:
-        if not data.get(field, '').strip():
-            errors.append(f"{field.replace('_', ' ').title()} is required")
-
-    # Validate description
-    if data.get('description'):
-        description = data['description'].strip()
-        if len(description) < 3:
-            errors.append("Description must be at least 3 characters")
-        if len(description) > 200:
-            errors.append("Description is too long (maximum 200 characters)")
-
-    # Validate amount
-    if data.get('amount'):
-        try:
-            amount = float(data['amount'])
-            if amount <= 0:
-                errors.append("Expense amount must be greater than 0")
-            if amount > 1000000:  # 1 million limit
-                errors.append("Expense amount is too large")
-        except (ValueError, TypeError):
-            errors.append("Invalid expense amount")
-
-    # Validate date
-    if data.get('date'):
-        is_valid, result = validate_date(data['date'], "Expense date")
-        if not is_valid:
-            errors.append(result)
-
-    # Validate category
-    valid_categories = [
-        'supplies', 'utilities', 'maintenance', 'salaries', 'transport',
-        'food', 'equipment', 'events', 'other'
-    ]
-
-    if data.get('category'):
-        if data['category'].lower() not in valid_categories:
-            errors.append(f"Category must be one of: {', '.join(valid_categories)}")
-
+    errors = missing_required(data, EXPENSE_REQUIRED)
+    _collect_errors(data, EXPENSE_CHECKS, errors)
     return errors
 
 
@@ -452,20 +494,17 @@ def sanitize_input(input_string, max_length=None):
     if not input_string:
         return ""
 
-    # Remove potential script tags and other harmful content
-    sanitized = re.sub(r'<[^>]*>', '', str(input_string))
+    sanitized = str(input_string)
 
-    # Remove null bytes and other control characters
-    sanitized = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', sanitized)
+    # Remove potential script tags and other harmful content (most input has no '<' at all)
+    if '<' in sanitized:
+        sanitized = HTML_TAG_PATTERN.sub('', sanitized)
 
-    # Trim whitespace
-    sanitized = sanitized.strip()
+    # Remove null bytes and other control characters, then trim whitespace
+    sanitized = sanitized.translate(CONTROL_CHAR_TABLE).strip()
 
     # Limit length if specified
-    if max_length and len(sanitized) > max_length:
-        sanitized = sanitized[:max_length]
-
-    return sanitized
+    return sanitized[:max_length] if max_length else sanitized
 
 
 def is_safe_filename(filename):
@@ -477,14 +516,8 @@ def is_safe_filename(filename):
     filename = filename.split('/')[-1].split('\\')[-1]
 
     # Check for dangerous patterns
-    dangerous_patterns = [
-        r'\.\.', r'[<>:"|?*]', r'^(con|prn|aux|nul|com[1-9]|lpt[1-9])(\.|$)',
-        r'^\s*$', r'^\.'
-    ]
-
-    for pattern in dangerous_patterns:
-        if re.search(pattern, filename, re.IGNORECASE):
-            return False
+    if any(pattern.search(filename) for pattern in DANGEROUS_FILENAME_PATTERNS):
+        return False
 
     # Check length
     if len(filename) > 255:
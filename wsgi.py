@@ -0,0 +1,8 @@
+# wsgi.py - Production entry point
+# pyodbc releases the GIL while waiting on SQL Server, so a threaded WSGI
+# server overlaps database round-trips across requests without an async
+# rewrite. Keep the thread count within DB_POOL_SIZE + DB_MAX_OVERFLOW, e.g.
+#   waitress-serve --threads=15 wsgi:app
+from app import create_app
+
+app = create_app()